@@ -0,0 +1,125 @@
+import asyncio
+import itertools
+
+from rdbms.protocol import encode_frame, read_frame
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5433
+
+
+class Client:
+    """
+    Asyncio client for the MiniRDBMS network server
+
+    Statements may be issued concurrently on one connection; they are
+    pipelined over the socket and replies are routed back by request id:
+
+        client = await Client.connect()
+        users, orders = await asyncio.gather(
+            client.execute("SELECT * FROM users;"),
+            client.execute("SELECT * FROM orders;"),
+        )
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.ids = itertools.count(1)
+        self.pending = {}
+        self.reader_task = asyncio.create_task(self.read_replies())
+
+    @classmethod
+    async def connect(cls, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def read_replies(self):
+        """Dispatch incoming frames to the queue of the request they answer"""
+        error = ConnectionError("Connection closed by server")
+        try:
+            while True:
+                message = await read_frame(self.reader)
+                queue = self.pending.get(message.get("id"))
+                if queue is not None:
+                    queue.put_nowait(message)
+                elif "error" in message:
+                    error = ConnectionError(message["error"])
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except asyncio.CancelledError:
+            error = ConnectionError("Client closed")
+
+        # Wake up everyone still waiting for a reply
+        for queue in self.pending.values():
+            queue.put_nowait({"error": str(error)})
+
+    def send(self, sql):
+        if self.reader_task.done():
+            raise ConnectionError("Connection is closed")
+        request_id = next(self.ids)
+        self.pending[request_id] = asyncio.Queue()
+        self.writer.write(encode_frame({"id": request_id, "sql": sql}))
+        return request_id
+
+    async def stream(self, sql):
+        """
+        Execute a statement and yield result rows as batches arrive
+        Status-only statements (INSERT, UPDATE, ...) yield nothing
+        """
+        request_id = self.send(sql)
+        queue = self.pending[request_id]
+        try:
+            await self.writer.drain()
+            while True:
+                message = await queue.get()
+                if "error" in message:
+                    raise Exception(message["error"])
+                for row in message.get("rows", []):
+                    yield row
+                if message.get("done"):
+                    break
+        finally:
+            self.pending.pop(request_id, None)
+
+    async def execute(self, sql):
+        """
+        Execute a statement and return its full result
+        Returns a list of rows for queries, or the status message otherwise
+        """
+        request_id = self.send(sql)
+        queue = self.pending[request_id]
+        rows = []
+        try:
+            await self.writer.drain()
+            while True:
+                message = await queue.get()
+                if "error" in message:
+                    raise Exception(message["error"])
+                rows.extend(message.get("rows", []))
+                if message.get("done"):
+                    return message["result"] if "result" in message else rows
+        finally:
+            self.pending.pop(request_id, None)
+
+    async def execute_many(self, statements):
+        """Pipeline several statements and return their results in order"""
+        return await asyncio.gather(*(self.execute(sql) for sql in statements))
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+        self.reader_task.cancel()
+        try:
+            await self.reader_task
+        except asyncio.CancelledError:
+            pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
@@ -1,5 +1,16 @@
-from tarfile import SUPPORTED_TYPES
-from rdbms.storage import save_schema, save_rows, load_schema
+import heapq
+from contextlib import ExitStack, contextmanager
+from itertools import islice
+from operator import itemgetter
+
+from rdbms.storage import (
+    save_schema, load_schema, table_exists, list_tables, table_entry,
+    save_view_definition, views_on, save_index_definition, secondary_indexes,
+    table_modified
+)
+from rdbms.mvcc import latest, snapshot, write_lock, commit, changed_keys
+from rdbms import maintenance, trigram
+from rdbms.keyindex import SortedIndex
 
 SUPPORTED_TYPES = {"INT", "TEXT"}
 
@@ -12,12 +23,9 @@ def create_table(table_name, columns):
     }
     """
 
-# 1. Ensuring a table does not already exist before creating one
-    try:
-        load_schema(table_name)
+    # 1. Ensuring a table does not already exist before creating one
+    if table_exists(table_name):
         raise Exception(f"Table '{table_name}' already exists")
-    except Exception:
-        pass  # Table does not exist, continue
 
     # 2. Validating the schema
     primary_keys = []
@@ -44,12 +52,12 @@ def create_table(table_name, columns):
         "primary_key": primary_keys[0]
     }
 
-    # 4. saving the schema and the created table
-    save_schema(table_name, schema)
-    save_rows(table_name, [])
-    
-    # Build empty index for new table
-    save_index(table_name, {})
+    # 4. saving the schema and the created table with an empty index
+    with write_lock(table_name):
+        if table_exists(table_name):
+            raise Exception(f"Table '{table_name}' already exists")
+        save_schema(table_name, schema)
+        commit(table_name, [], {})
 
     return f"Table '{table_name}' created successfully."
 
@@ -62,12 +70,10 @@ def validate_type(value, expected_type):
     return False
 
 
-from rdbms.storage import load_schema, load_rows, save_rows, load_index, save_index
-
 
 def insert_into(table_name, values):
+    ensure_writable(table_name)
     schema = load_schema(table_name)
-    rows = load_rows(table_name)
 
     columns = schema["columns"]
     primary_key = schema["primary_key"]
@@ -100,76 +106,113 @@ def insert_into(table_name, values):
     else:
         raise Exception("Values must be either a list or dictionary")
 
-    # Primary key uniqueness
-    for existing in rows:
-        if existing[primary_key] == row[primary_key]:
+    with view_base_locks(table_name):
+        base = latest(table_name)
+        rows = base.rows
+
+        # Primary key uniqueness - index keys keep the column's type
+        if row[primary_key] in base.index:
             raise Exception("Primary key constraint violated")
 
-    # Unique constraints
-    for col_name, col_def in columns.items():
-        if col_def.get("unique"):
-            for existing in rows:
-                if existing[col_name] == row[col_name]:
-                    raise Exception(f"Unique constraint violated on '{col_name}'")
+        # Unique constraints
+        for col_name, col_def in columns.items():
+            if col_def.get("unique"):
+                for existing in rows:
+                    if existing[col_name] == row[col_name]:
+                        raise Exception(f"Unique constraint violated on '{col_name}'")
 
-    rows.append(row)
-    save_rows(table_name, rows)
+        # Copy on write - readers of the previous version keep their rows
+        rows = rows + [row]
     
-    # Update index with new row
-    index = load_index(table_name)
-    pk_value = str(row[primary_key])
-    index[pk_value] = len(rows) - 1
-    save_index(table_name, index)
+        # Update index with new row
+        index = dict(base.index.items())
+        index[row[primary_key]] = len(rows) - 1
+        secondary = maintain_indexes(table_name, base, [], [row])
+        commit(table_name, rows, index, secondary, changed={row[primary_key]})
+        apply_view_deltas(table_name, [], [row])
 
     return "1 row inserted."
 
 
+def pk_index_for(rows, pk):
+    """
+    Build a primary key index for a list of rows
+    Maps primary key values to row positions in the rows list
+    """
+    index = {}
+    for i, row in enumerate(rows):
+        index[row[pk]] = i
+    return index
+
+
 def build_pk_index(table_name):
     """
     Build primary key index for a table
     Maps primary key values to row positions in the rows list
     """
     schema = load_schema(table_name)
-    rows = load_rows(table_name)
-    
-    # Find primary key column
-    pk = schema["primary_key"]
     
-    # Build index: pk_value -> row_position
-    index = {}
-    for i, row in enumerate(rows):
-        index[str(row[pk])] = i
+    with write_lock(table_name):
+        rows = latest(table_name).rows
+        index = pk_index_for(rows, schema["primary_key"])
+        commit(table_name, rows, index, changed=set())
     
-    save_index(table_name, index)
     return index
 
 
-def inner_join(left_table, right_table, left_key, right_key):
+def combine_rows(left_table, left_row, right_table, right_row):
+    """Combine a matching pair of rows, prefixing columns with table names"""
+    combined = {}
+    
+    for k, v in left_row.items():
+        combined[f"{left_table}.{k}"] = v
+        
+    for k, v in right_row.items():
+        combined[f"{right_table}.{k}"] = v
+        
+    return combined
+
+
+def iter_inner_join(left, right, left_key, right_key):
     """
-    Perform INNER JOIN between two tables
-    Returns combined rows with prefixed column names
+    Nested loop INNER JOIN over two pinned table versions
+    Yields combined rows one at a time
     """
-    left_rows = load_rows(left_table)
-    right_rows = load_rows(right_table)
-    
-    result = []
-    
     # Nested loop join - O(n × m) baseline
-    for left_row in left_rows:
-        for right_row in right_rows:
+    for left_row in left.rows:
+        for right_row in right.rows:
             if left_row[left_key] == right_row[right_key]:
-                combined = {}
-                
-                # Prefix columns with table names
-                for k, v in left_row.items():
-                    combined[f"{left_table}.{k}"] = v
-                    
-                for k, v in right_row.items():
-                    combined[f"{right_table}.{k}"] = v
-                    
-                result.append(combined)
+                yield combine_rows(left.table, left_row, right.table, right_row)
+
+
+def iter_inner_join_optimized(left, right, left_key, right_key):
+    """
+    Indexed INNER JOIN over two pinned table versions
+    Uses the primary key index when right_key is the primary key
+    """
+    right_schema = load_schema(right.table)
     
-    return result
+    # Check if right_key is primary key (can use index)
+    if right_schema.get("primary_key") != right_key:
+        # Fall back to nested loop join
+        yield from iter_inner_join(left, right, left_key, right_key)
+        return
+    
+    # Use index for O(1) lookups
+    for left_row in left.rows:
+        position = right.index.get(left_row[left_key])
+        
+        if position is not None:
+            yield combine_rows(left.table, left_row, right.table, right.rows[position])
+
+
+def inner_join(left_table, right_table, left_key, right_key):
+    """
+    Perform INNER JOIN between two tables
+    Returns combined rows with prefixed column names
+    """
+    with snapshot(left_table, right_table) as (left, right):
+        return list(iter_inner_join(left, right, left_key, right_key))
 
 
 def inner_join_optimized(left_table, right_table, left_key, right_key):
@@ -177,71 +220,193 @@ def inner_join_optimized(left_table, right_table, left_key, right_key):
     Optimized INNER JOIN using index when right_key is a primary key
     Reduces complexity from O(n × m) to O(n + m)
     """
-    left_rows = load_rows(left_table)
-    right_rows = load_rows(right_table)
-    right_schema = load_schema(right_table)
+    with snapshot(left_table, right_table) as (left, right):
+        return list(iter_inner_join_optimized(left, right, left_key, right_key))
+
+
+def select_join(left_table, right_table, left_key, right_key, optimized=True,
+                order_by=None, limit=None):
+    """
+    High-level JOIN API that automatically chooses optimization
+    Returns combined rows with prefixed column names
+    order_by is a list of (column, "ASC"/"DESC") pairs; columns may be
+    written as table.column or, when unambiguous, as the bare column name
+    """
+    return list(iter_select_join(left_table, right_table, left_key, right_key,
+                                 optimized, order_by, limit))
+
+
+def iter_select_join(left_table, right_table, left_key, right_key, optimized=True,
+                     order_by=None, limit=None):
+    """
+    Like select_join, but yields rows one at a time
+    Both tables stay pinned until the generator is exhausted or closed
+    """
+    with snapshot(left_table, right_table) as (left, right):
+        if optimized:
+            rows = iter_inner_join_optimized(left, right, left_key, right_key)
+        else:
+            rows = iter_inner_join(left, right, left_key, right_key)
+        
+        yield from finish_join(rows, left_table, right_table, order_by, limit)
+
+
+def finish_join(rows, left_table, right_table, order_by, limit):
+    """
+    Apply ORDER BY / LIMIT to lazily produced join rows
+    Without ORDER BY the rows stay lazy
+    """
+    if order_by:
+        columns = {}
+        for table_name in (left_table, right_table):
+            for col_name in load_schema(table_name)["columns"]:
+                columns[f"{table_name}.{col_name}"] = col_name
+        
+        resolved = []
+        for column, direction in order_by:
+            if column not in columns:
+                matches = [name for name, bare in columns.items() if bare == column]
+                if len(matches) != 1:
+                    raise Exception(f"Unknown or ambiguous column '{column}' in ORDER BY")
+                column = matches[0]
+            resolved.append((column, direction))
+        
+        # The join result is consumed lazily, so a LIMIT keeps only k rows
+        return order_rows(rows, resolved, limit)
     
-    result = []
+    return islice(rows, limit)
+
+
+def order_rows(rows, order_by, limit=None):
+    """
+    Order rows by a list of (column, "ASC"/"DESC") pairs
+    With a LIMIT, a bounded heap keeps only the best k rows seen so far,
+    which costs O(n log k) instead of sorting everything. Mixed directions
+    are sorted in stable passes, one per column, so every comparison
+    still runs in C
+    """
+    columns = [column for column, _ in order_by]
+    descending = [direction == "DESC" for _, direction in order_by]
     
-    # Check if right_key is primary key (can use index)
-    if right_schema.get("primary_key") == right_key:
-        index = load_index(right_table)
-        
-        # Use index for O(1) lookups
-        for left_row in left_rows:
-            lookup_value = str(left_row[left_key])
-            position = index.get(lookup_value)
-            
-            if position is not None:
-                right_row = right_rows[position]
-                combined = {}
-                
-                for k, v in left_row.items():
-                    combined[f"{left_table}.{k}"] = v
-                    
-                for k, v in right_row.items():
-                    combined[f"{right_table}.{k}"] = v
-                    
-                result.append(combined)
-    else:
-        # Fall back to nested loop join
-        return inner_join(left_table, right_table, left_key, right_key)
+    if len(set(descending)) == 1:
+        # One direction for every column - a plain key compared in C
+        key = itemgetter(*columns)
+        if limit is not None:
+            pick = heapq.nlargest if descending[0] else heapq.nsmallest
+            return pick(limit, rows, key=key)
+        return sorted(rows, key=key, reverse=descending[0])
     
-    return result
+    rows = list(rows)
+    
+    if limit is not None:
+        # Only rows up to the k-th value of the first column (ties
+        # included) can make it into the result
+        first, first_desc = columns[0], descending[0]
+        pick = heapq.nlargest if first_desc else heapq.nsmallest
+        bound = pick(limit, map(itemgetter(first), rows))
+        if not bound:
+            return []
+        cutoff = bound[-1]
+        if first_desc:
+            rows = [row for row in rows if row[first] >= cutoff]
+        else:
+            rows = [row for row in rows if row[first] <= cutoff]
+    
+    # Mixed directions - stable sorts from the last column to the first
+    for column, desc in reversed(list(zip(columns, descending))):
+        rows.sort(key=itemgetter(column), reverse=desc)
+    
+    return rows if limit is None else rows[:limit]
 
 
-def select_join(left_table, right_table, left_key, right_key, optimized=True):
+def pk_order(version):
     """
-    High-level JOIN API that automatically chooses optimization
-    Returns combined rows with prefixed column names
+    Row positions of a table version in ascending primary key order
+    Built from the primary key index once per version and cached on it,
+    so repeated ordered reads do not sort again
     """
-    if optimized:
-        return inner_join_optimized(left_table, right_table, left_key, right_key)
-    else:
-        return inner_join(left_table, right_table, left_key, right_key)
+    positions = version.cache.get("pk_order")
+    if positions is None:
+        if isinstance(version.index, SortedIndex):
+            # Index files are stored in key order already
+            positions = version.index.positions()
+        else:
+            positions = [pos for _, pos in sorted(version.index.items())]
+        version.cache["pk_order"] = positions
+    return positions
+
+
+def pk_positions(version, limit=None, descending=False):
+    """
+    Row positions of the first limit rows in primary key order
+    Without a cached order, a LIMIT picks k index entries with a heap
+    instead of sorting the whole index - every write replaces the
+    memory-mapped index (which is stored in key order) with a dict
+    """
+    if limit is not None and "pk_order" not in version.cache \
+            and not isinstance(version.index, SortedIndex):
+        pick = heapq.nlargest if descending else heapq.nsmallest
+        index = version.index
+        return [index[key] for key in pick(limit, index)]
+    
+    positions = pk_order(version)
+    if descending:
+        positions = reversed(positions)
+    return islice(positions, limit)
 
 
-def select(table_name, ordered_by_pk=False):
+def select(table_name, ordered_by_pk=False, order_by=None, limit=None, where=None):
     """
     Select all rows from a table
     Returns a list of dictionaries representing the rows
     If ordered_by_pk=True, returns rows ordered by primary key
+    order_by is a list of (column, "ASC"/"DESC") pairs and takes
+    precedence over ordered_by_pk; limit caps the number of rows returned
+    where is a (column, operator, value) filter with operator "=" or "LIKE"
+    """
+    return list(iter_select(table_name, ordered_by_pk, order_by, limit, where))
+
+
+def iter_select(table_name, ordered_by_pk=False, order_by=None, limit=None, where=None):
+    """
+    Like select, but yields rows one at a time
+    The table stays pinned until the generator is exhausted or closed
     """
     schema = load_schema(table_name)
-    rows = load_rows(table_name)
+    pk = schema["primary_key"]
     
-    if ordered_by_pk:
-        # Sort rows by primary key using the index
-        index = load_index(table_name)
-        pk = schema["primary_key"]
-        
-        # Create a list of (pk_value, row) tuples and sort by pk_value
-        sorted_rows = []
-        for pk_value, pos in sorted(index.items(), key=lambda x: int(x[0]) if x[0].isdigit() else x[0]):
-            sorted_rows.append(rows[pos])
-        return sorted_rows
+    for column, _ in order_by or []:
+        if column not in schema["columns"]:
+            raise Exception(f"Unknown column '{column}' in ORDER BY")
     
-    return rows
+    with snapshot(table_name) as (version,):
+        rows = version.rows
+        
+        if where is not None:
+            rows = filter_rows(version, schema, where)
+            if order_by:
+                yield from order_rows(rows, order_by, limit)
+            elif ordered_by_pk and pk is not None:
+                yield from order_rows(rows, [(pk, "ASC")], limit)
+            else:
+                yield from islice(rows, limit)
+            return
+        
+        if order_by and order_by[0][0] == pk:
+            # The primary key is unique, so later sort columns never matter
+            # and rows can be read straight off the ordered index
+            positions = pk_positions(version, limit, order_by[0][1] == "DESC")
+            yield from (rows[pos] for pos in positions)
+        
+        elif order_by:
+            yield from order_rows(rows, order_by, limit)
+        
+        elif ordered_by_pk and pk is not None:
+            # Sort rows by primary key using the index
+            yield from (rows[pos] for pos in pk_positions(version, limit))
+        
+        else:
+            yield from islice(rows, limit)
 
 
 def select_by_pk(table_name, pk_value):
@@ -249,13 +414,10 @@ def select_by_pk(table_name, pk_value):
     Select a single row by primary key using index (O(1) lookup)
     Returns the row dictionary or None if not found
     """
-    schema = load_schema(table_name)
-    rows = load_rows(table_name)
-    index = load_index(table_name)
-    
-    pos = index.get(str(pk_value))
-    if pos is not None:
-        return rows[pos]
+    with snapshot(table_name) as (version,):
+        pos = version.index.get(pk_value)
+        if pos is not None:
+            return version.rows[pos]
     return None
 
 
@@ -264,21 +426,27 @@ def delete_from(table_name, where_column, where_value):
     Delete rows from a table where column matches value
     Returns number of deleted rows
     """
+    ensure_writable(table_name)
     schema = load_schema(table_name)
-    rows = load_rows(table_name)
-    
-    # Find rows to delete
-    original_count = len(rows)
-    rows = [row for row in rows if row[where_column] != where_value]
-    deleted_count = original_count - len(rows)
-    
-    if deleted_count == 0:
-        return "0 rows deleted."
-    
-    save_rows(table_name, rows)
     
-    # Rebuild index after deletion (simple but inefficient)
-    build_pk_index(table_name)
+    with view_base_locks(table_name):
+        base = latest(table_name)
+        rows = base.rows
+        
+        # Find rows to delete
+        deleted = [row for row in rows if row[where_column] == where_value]
+        rows = [row for row in rows if row[where_column] != where_value]
+        deleted_count = len(deleted)
+        
+        if deleted_count == 0:
+            return "0 rows deleted."
+        
+        # Rebuild index after deletion (simple but inefficient)
+        index = pk_index_for(rows, schema["primary_key"])
+        secondary = maintain_indexes(table_name, base, deleted, [])
+        changed = {row[schema["primary_key"]] for row in deleted}
+        commit(table_name, rows, index, secondary, changed)
+        apply_view_deltas(table_name, deleted, [])
     
     return f"{deleted_count} row(s) deleted."
 
@@ -288,8 +456,8 @@ def update(table_name, set_column, set_value, where_column, where_value):
     Update rows in a table where column matches value
     Returns number of updated rows
     """
+    ensure_writable(table_name)
     schema = load_schema(table_name)
-    rows = load_rows(table_name)
     columns = schema["columns"]
     
     # Validate the set value type
@@ -297,15 +465,397 @@ def update(table_name, set_column, set_value, where_column, where_value):
         if not validate_type(set_value, columns[set_column]["type"]):
             raise Exception(f"Invalid type for column '{set_column}'")
     
-    # Find and update matching rows
-    updated_count = 0
-    for row in rows:
-        if row[where_column] == where_value:
-            row[set_column] = set_value
-            updated_count += 1
-    
-    if updated_count == 0:
-        return "0 rows updated."
+    with view_base_locks(table_name):
+        base = latest(table_name)
+        rows = list(base.rows)
+        
+        # Find and update matching rows - changed rows are copied so
+        # readers of the previous version keep seeing the old values
+        old_rows = []
+        new_rows = []
+        for i, row in enumerate(rows):
+            if row[where_column] == where_value:
+                old_rows.append(row)
+                row = dict(row)
+                row[set_column] = set_value
+                rows[i] = row
+                new_rows.append(row)
+        updated_count = len(new_rows)
+        
+        if updated_count == 0:
+            return "0 rows updated."
+        
+        # Updating a key column must not create duplicates
+        if set_column == schema["primary_key"] or columns.get(set_column, {}).get("unique"):
+            values = [row[set_column] for row in rows]
+            if len(values) != len(set(values)):
+                if set_column == schema["primary_key"]:
+                    raise Exception("Primary key constraint violated")
+                raise Exception(f"Unique constraint violated on '{set_column}'")
+        
+        index = base.index
+        if set_column == schema["primary_key"]:
+            index = pk_index_for(rows, set_column)
+        secondary = maintain_indexes(table_name, base, old_rows, new_rows)
+        pk = schema["primary_key"]
+        changed = {row[pk] for row in old_rows} | {row[pk] for row in new_rows}
+        commit(table_name, rows, index, secondary, changed)
+        apply_view_deltas(table_name, old_rows, new_rows)
     
-    save_rows(table_name, rows)
     return f"{updated_count} row(s) updated."
+
+
+def show_tables():
+    """
+    List all tables from the catalog
+    Served from memory - no table files are read
+    """
+    result = []
+    for table_name in list_tables():
+        entry = table_entry(table_name)
+        result.append({
+            "table": table_name,
+            "type": "view" if entry.get("view") else "table",
+            "primary_key": entry["schema"]["primary_key"],
+            "rows": entry["stats"]["row_count"]
+        })
+    return result
+
+
+def describe_table(table_name):
+    """
+    Describe the columns of a table from the catalog
+    Returns one dictionary per column
+    """
+    schema = load_schema(table_name)
+
+    distinct = table_entry(table_name)["stats"].get("distinct", {})
+
+    result = []
+    for col_name, col_def in schema["columns"].items():
+        result.append({
+            "column": col_name,
+            "type": col_def["type"],
+            "primary_key": bool(col_def.get("primary_key")),
+            "unique": bool(col_def.get("unique")),
+            "distinct": distinct.get(col_name)
+        })
+    return result
+
+
+def ensure_writable(table_name):
+    """Materialized views are only changed through their base tables"""
+    if table_entry(table_name).get("view"):
+        raise Exception(f"Cannot modify materialized view '{table_name}'")
+
+
+def view_partners(table_name):
+    """A table plus every table it is joined with by a materialized view"""
+    tables = {table_name}
+    for view_name in views_on(table_name):
+        definition = table_entry(view_name)["view"]
+        tables.update((definition["left"], definition["right"]))
+    return tables
+
+
+@contextmanager
+def view_base_locks(table_name):
+    """
+    Write locks for a table and the other base tables of its views
+    A view delta joins the changed rows against the other base table, so
+    that table must not change until the view is updated too. Locks are
+    taken in sorted order like in create_materialized_view
+    """
+    while True:
+        tables = view_partners(table_name)
+        with ExitStack() as stack:
+            for name in sorted(tables):
+                stack.enter_context(write_lock(name))
+            
+            # A view may have been created while we waited
+            if view_partners(table_name) == tables:
+                yield
+                return
+
+
+def create_materialized_view(view_name, left_table, right_table, left_key, right_key):
+    """
+    Create a materialized view over an INNER JOIN of two tables
+    The join result is stored as a table and kept up to date by applying
+    the rows changed by every INSERT, UPDATE and DELETE on the base tables
+    """
+    if table_exists(view_name):
+        raise Exception(f"Table '{view_name}' already exists")
+    
+    if left_table == right_table:
+        raise Exception("Materialized views over a self-join are not supported")
+    
+    columns = {}
+    for table_name, key in ((left_table, left_key), (right_table, right_key)):
+        schema = load_schema(table_name)
+        
+        # Views are only maintained from plain tables - a view's own
+        # changes are never propagated further
+        if table_entry(table_name).get("view"):
+            raise Exception(f"Cannot build a materialized view on view '{table_name}'")
+        if key not in schema["columns"]:
+            raise Exception(f"Unknown column '{key}' in table '{table_name}'")
+        for col_name, col_def in schema["columns"].items():
+            columns[f"{table_name}.{col_name}"] = {"type": col_def["type"]}
+    
+    # Join rows have no single-column key, so views have no primary key
+    schema = {
+        "table": view_name,
+        "columns": columns,
+        "primary_key": None
+    }
+    definition = {
+        "left": left_table,
+        "right": right_table,
+        "on": [left_key, right_key]
+    }
+    
+    # Hold the base tables still (in a fixed order) so no write slips in
+    # between computing the join and registering the view
+    first, second = sorted((left_table, right_table))
+    with write_lock(first), write_lock(second), write_lock(view_name):
+        if table_exists(view_name):
+            raise Exception(f"Table '{view_name}' already exists")
+        
+        rows = inner_join_optimized(left_table, right_table, left_key, right_key)
+        save_schema(view_name, schema)
+        commit(view_name, rows, {})
+        
+        # Make sure the view's rows are on disk before the catalog says
+        # it is maintained from its base tables
+        maintenance.flush()
+        save_view_definition(view_name, definition)
+    
+    return f"Materialized view '{view_name}' created with {len(rows)} row(s)."
+
+
+def apply_view_deltas(table_name, removed, added):
+    """
+    Bring materialized views on a base table up to date
+    removed are the old versions of rows that were deleted or updated and
+    added the new or updated rows; the caller holds view_base_locks()
+    for the base table
+    """
+    for view_name in views_on(table_name):
+        definition = table_entry(view_name)["view"]
+        
+        with write_lock(view_name):
+            rows = view_delta(definition, table_name, latest(view_name).rows, removed, added)
+            commit(view_name, rows, {})
+
+
+def view_delta(definition, table_name, rows, removed, added):
+    """
+    Apply one base table's changes to the rows of a join view
+    Costs O(view rows) for removals plus one lookup per added row,
+    instead of recomputing the whole join
+    """
+    left_table, right_table = definition["left"], definition["right"]
+    left_key, right_key = definition["on"]
+    
+    if table_name == left_table:
+        other_table, key, other_key = right_table, left_key, right_key
+    else:
+        other_table, key, other_key = left_table, right_key, left_key
+    
+    if removed:
+        # Base rows are identified in the view by their primary key
+        pk = load_schema(table_name)["primary_key"]
+        pk_column = f"{table_name}.{pk}"
+        gone = {row[pk] for row in removed}
+        rows = [row for row in rows if row[pk_column] not in gone]
+    
+    if added:
+        # The other base table is write locked by the caller, so its
+        # latest version is the one the view must match
+        with snapshot(other_table) as (other,):
+            if load_schema(other_table)["primary_key"] == other_key:
+                # Match through the other table's primary key index
+                def matches(value):
+                    position = other.index.get(value)
+                    return [] if position is None else [other.rows[position]]
+            else:
+                # Hash the other side once for the whole batch
+                buckets = {}
+                for other_row in other.rows:
+                    buckets.setdefault(other_row[other_key], []).append(other_row)
+                
+                def matches(value):
+                    return buckets.get(value, [])
+            
+            new_rows = []
+            for row in added:
+                for other_row in matches(row[key]):
+                    if table_name == left_table:
+                        new_rows.append(combine_rows(left_table, row, right_table, other_row))
+                    else:
+                        new_rows.append(combine_rows(left_table, other_row, right_table, row))
+        
+        rows = rows + new_rows
+    
+    return rows
+
+
+def filter_rows(version, schema, where):
+    """
+    Rows of a pinned table version matching a WHERE filter, produced
+    lazily so a LIMIT can stop the scan early
+    LIKE uses a trigram index on the column when there is one to narrow
+    the candidates, then checks each candidate against the pattern
+    """
+    column, operator, value = where
+    columns = schema["columns"]
+    rows = version.rows
+    
+    if column not in columns:
+        raise Exception(f"Unknown column '{column}' in WHERE")
+    
+    if operator == "=":
+        if column == schema["primary_key"]:
+            pos = version.index.get(value)
+            return iter([] if pos is None else [rows[pos]])
+        return (row for row in rows if row[column] == value)
+    
+    if operator != "LIKE":
+        raise Exception(f"Unsupported operator '{operator}' in WHERE")
+    
+    if columns[column]["type"] != "TEXT" or not isinstance(value, str):
+        raise Exception("LIKE requires a TEXT column and a string pattern")
+    
+    matches = trigram.like_matcher(value)
+    
+    for index_name, definition in secondary_indexes(version.table).items():
+        postings = version.secondary.get(index_name)
+        if postings is not None and definition["type"] == "trigram" and definition["column"] == column:
+            keys = trigram.candidates(postings, value)
+            if keys is None:
+                break
+            
+            # Keep table order so results match a full scan
+            positions = sorted(version.index[key] for key in keys)
+            return (rows[pos] for pos in positions if matches(rows[pos][column]))
+    
+    # No usable index - check every row
+    return (row for row in rows if matches(row[column]))
+
+
+def maintain_indexes(table_name, base, removed, added):
+    """
+    Secondary indexes for a new version of a table
+    removed and added are the rows a write took out and put in
+    """
+    definitions = secondary_indexes(table_name)
+    if not definitions:
+        return base.secondary
+    
+    pk = load_schema(table_name)["primary_key"]
+    secondary = dict(base.secondary)
+    
+    for index_name, definition in definitions.items():
+        secondary[index_name] = trigram.update_postings(
+            base.secondary[index_name], definition["column"], pk, removed, added
+        )
+    
+    return secondary
+
+
+def create_index(table_name, index_name, column, method="TRIGRAM", if_not_exists=False):
+    """
+    Create a secondary index on a TEXT column
+    Only trigram indexes are supported; they speed up LIKE searches and
+    are kept up to date by every INSERT, UPDATE and DELETE
+    """
+    if method.upper() != "TRIGRAM":
+        raise Exception(f"Unsupported index method '{method}'")
+    
+    ensure_writable(table_name)
+    schema = load_schema(table_name)
+    
+    if column not in schema["columns"]:
+        raise Exception(f"Unknown column '{column}' in table '{table_name}'")
+    
+    if schema["columns"][column]["type"] != "TEXT":
+        raise Exception("Trigram indexes require a TEXT column")
+    
+    with write_lock(table_name):
+        if index_name == "pk" or index_name in secondary_indexes(table_name):
+            if if_not_exists:
+                return f"Index '{index_name}' already exists."
+            raise Exception(f"Index '{index_name}' already exists")
+        
+        base = latest(table_name)
+        secondary = dict(base.secondary)
+        secondary[index_name] = trigram.build_postings(base.rows, column, schema["primary_key"])
+        
+        # Publish and write the postings before the catalog points readers
+        # at them
+        commit(table_name, base.rows, base.index, secondary, changed=set())
+        maintenance.flush()
+        save_index_definition(table_name, index_name, {
+            "column": column,
+            "type": "trigram"
+        })
+    
+    return f"Index '{index_name}' created on {table_name}({column})."
+
+
+def table_version(table_name):
+    """
+    Version number of a table, bumped by every write
+    Suitable as a cache validator such as an HTTP ETag
+    """
+    return latest(table_name).version
+
+
+def last_modified(table_name):
+    """Unix timestamp of the last write to a table"""
+    latest(table_name)
+    return table_modified(table_name)
+
+
+def changes_since(table_name, since):
+    """
+    Rows changed since a table version
+    Returns a dictionary with the current "version", the "rows" inserted or
+    updated since then and the primary keys "deleted" since then. When the
+    change log does not reach back to since, "full" is True and "rows"
+    holds the whole table ordered by primary key
+    """
+    schema = load_schema(table_name)
+    pk = schema["primary_key"]
+    
+    with snapshot(table_name) as (version,):
+        keys = None
+        if pk is not None:
+            keys = changed_keys(table_name, since, version.version)
+        
+        if keys is None:
+            rows = version.rows
+            if pk is not None:
+                rows = [rows[pos] for pos in pk_order(version)]
+            return {"version": version.version, "full": True, "rows": list(rows), "deleted": []}
+        
+        rows = []
+        deleted = []
+        for key in sorted(keys):
+            pos = version.index.get(key)
+            if pos is None:
+                deleted.append(key)
+            else:
+                rows.append(version.rows[pos])
+        
+        return {"version": version.version, "full": False, "rows": rows, "deleted": deleted}
+
+
+def checkpoint():
+    """
+    Force dirty tables, indexes, statistics and the catalog to disk now
+    Normally the background maintenance thread does this on its own
+    """
+    flushed = maintenance.checkpoint()
+    return f"Checkpoint complete: {flushed} table(s) flushed."
@@ -0,0 +1,189 @@
+"""
+Binary primary key index files
+
+An index maps primary key values (int or str, never stringified) to row
+positions. In memory a freshly written index is a plain dict; on disk it is
+stored as sorted arrays that are memory-mapped when the table is loaded, so
+opening a large table costs a header read instead of parsing millions of
+JSON keys:
+
+    header     magic "PKIX", key type (1 = INT, 2 = TEXT), key count n
+    INT keys   n little-endian int64 values, ascending
+    TEXT keys  n + 1 int64 byte offsets into the UTF-8 blob at the end
+    positions  n int64 row positions, in key order
+    blob       UTF-8 encoded TEXT keys, ascending (TEXT indexes only)
+
+A loaded file is a SortedIndex: a read-only mapping that finds keys by
+binary search. Writers copy it into a dict before changing it.
+"""
+
+import bisect
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+
+MAGIC = b"PKIX"
+HEADER = struct.Struct("<4sB3xQ")
+
+INT_KEYS = 1
+TEXT_KEYS = 2
+
+# Arrays are stored little-endian so they can be cast in place
+NATIVE = sys.byteorder == "little"
+
+
+class TextKeys:
+    """Sequence view of the TEXT keys of a SortedIndex, decoded on access"""
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+
+class SortedIndex(Mapping):
+    """Read-only primary key index backed by a memory-mapped file"""
+
+    def __init__(self, key_type, keys, positions, buffer=None):
+        self.key_type = key_type
+        self.key_array = keys
+        self.position_array = positions
+
+        # Keeps the mapping open for as long as the index is in use
+        self.buffer = buffer
+
+    def find(self, key):
+        """Slot of key in the sorted arrays, or -1 if it is not present"""
+        if self.key_type == INT_KEYS:
+            if not isinstance(key, int):
+                return -1
+        elif not isinstance(key, str):
+            return -1
+
+        slot = bisect.bisect_left(self.key_array, key)
+        if slot < len(self.key_array) and self.key_array[slot] == key:
+            return slot
+        return -1
+
+    def __getitem__(self, key):
+        slot = self.find(key)
+        if slot < 0:
+            raise KeyError(key)
+        return self.position_array[slot]
+
+    def get(self, key, default=None):
+        slot = self.find(key)
+        return default if slot < 0 else self.position_array[slot]
+
+    def __contains__(self, key):
+        return self.find(key) >= 0
+
+    def __iter__(self):
+        keys = self.key_array
+        return (keys[i] for i in range(len(keys)))
+
+    def __len__(self):
+        return len(self.position_array)
+
+    def items(self):
+        return zip(self, self.position_array)
+
+    def values(self):
+        return self.positions()
+
+    def positions(self):
+        """Row positions in ascending primary key order"""
+        return self.position_array.tolist()
+
+
+def key_type_of(index, key_type=None):
+    """
+    Storage key type for the keys of an index
+    key_type is the type the keys should have, e.g. from the schema;
+    otherwise it is taken from the keys themselves
+    """
+    if key_type in (None, INT_KEYS) and all(isinstance(key, int) for key in index):
+        return INT_KEYS
+    if key_type in (None, TEXT_KEYS) and all(isinstance(key, str) for key in index):
+        return TEXT_KEYS
+    raise Exception("Primary key index keys do not match the primary key type")
+
+
+def int64_array(values):
+    data = array("q", values)
+    if not NATIVE:
+        data.byteswap()
+    return data
+
+
+def write_index(path, index, key_type=None):
+    """
+    Write an index atomically in the sorted binary format
+    key_type (INT_KEYS or TEXT_KEYS) is needed to record the type of an
+    empty index; without it empty indexes are stored as INT_KEYS
+    """
+    if isinstance(index, SortedIndex):
+        key_type = key_type_of(index, key_type or index.key_type)
+        keys = list(index)
+        positions = index.positions()
+    else:
+        key_type = key_type_of(index, key_type)
+        keys = sorted(index)
+        positions = [index[key] for key in keys]
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, key_type, len(keys)))
+        if key_type == INT_KEYS:
+            f.write(int64_array(keys).tobytes())
+            f.write(int64_array(positions).tobytes())
+        else:
+            encoded = [key.encode("utf-8") for key in keys]
+            offsets = [0]
+            for key in encoded:
+                offsets.append(offsets[-1] + len(key))
+            f.write(int64_array(offsets).tobytes())
+            f.write(int64_array(positions).tobytes())
+            f.write(b"".join(encoded))
+    os.replace(tmp_path, path)
+
+
+def int64_view(buffer, start, count):
+    """count int64 values of buffer from byte offset start"""
+    view = memoryview(buffer)[start:start + count * 8]
+    if NATIVE:
+        return view.cast("q")
+
+    data = array("q", view.tobytes())
+    data.byteswap()
+    return data
+
+
+def open_index(path):
+    """Memory-map an index file written by write_index"""
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, key_type, count = HEADER.unpack_from(buffer)
+    if magic != MAGIC or key_type not in (INT_KEYS, TEXT_KEYS):
+        raise Exception(f"Not a primary key index file: {path}")
+
+    start = HEADER.size
+    if key_type == INT_KEYS:
+        keys = int64_view(buffer, start, count)
+        positions = int64_view(buffer, start + count * 8, count)
+    else:
+        offsets = int64_view(buffer, start, count + 1)
+        positions = int64_view(buffer, start + (count + 1) * 8, count)
+        blob = memoryview(buffer)[start + (2 * count + 1) * 8:]
+        keys = TextKeys(offsets, blob)
+
+    return SortedIndex(key_type, keys, positions, buffer)
@@ -0,0 +1,212 @@
+"""
+Background checkpointing, compaction and statistics
+
+Statements only change in-memory table versions (rdbms/mvcc.py) and mark
+the table dirty here. A background thread owns everything that touches
+disk:
+
+- flushing dirty tables (rows, primary key index, trigram indexes) every
+  FLUSH_INTERVAL seconds, or sooner once DIRTY_BYTES_LIMIT estimated bytes
+  have piled up
+- saving the catalog with the tables' statistics
+- compaction: tables that grow past COMPACT_ROWS rows store their rows
+  and trigram indexes in the compact JSON format
+- refreshing per-column distinct counts every STATS_INTERVAL seconds
+
+A CHECKPOINT statement forces all of it to happen immediately, and a final
+checkpoint runs when the process exits.
+"""
+
+import atexit
+import threading
+import time
+
+from rdbms.storage import (
+    save_rows, save_index, save_secondary_index, flush_catalog, save_statistics,
+    table_format, set_table_format, COMPACT_FORMAT
+)
+from rdbms.keyindex import SortedIndex
+
+# Seconds between background flushes
+FLUSH_INTERVAL = 1.0
+
+# Estimated unflushed bytes that trigger a flush before the interval ends
+DIRTY_BYTES_LIMIT = 4 * 1024 * 1024
+
+# Seconds between statistics refreshes
+STATS_INTERVAL = 60.0
+
+# Row count from which a table is stored in compact JSON
+COMPACT_ROWS = 10000
+
+# Rough serialized size of one changed row, used for dirty byte estimates
+ROW_BYTES_ESTIMATE = 100
+
+_condition = threading.Condition()
+_dirty = {}          # table_name -> latest unflushed TableVersion
+_dirty_bytes = 0
+_stale_stats = {}    # table_name -> latest version without fresh statistics
+_thread = None
+_stopping = False
+
+# Serializes flushes so an older version never overwrites a newer one
+_flush_lock = threading.Lock()
+_flushed_secondary = {}  # (table_name, index_name) -> postings last written
+
+
+def configure(flush_interval=None, dirty_bytes=None, stats_interval=None, compact_rows=None):
+    """Change maintenance settings; takes effect at the next wake-up"""
+    global FLUSH_INTERVAL, DIRTY_BYTES_LIMIT, STATS_INTERVAL, COMPACT_ROWS
+    with _condition:
+        if flush_interval is not None:
+            FLUSH_INTERVAL = flush_interval
+        if dirty_bytes is not None:
+            DIRTY_BYTES_LIMIT = dirty_bytes
+        if stats_interval is not None:
+            STATS_INTERVAL = stats_interval
+        if compact_rows is not None:
+            COMPACT_ROWS = compact_rows
+        _condition.notify()
+
+
+def mark_dirty(version, changed_rows):
+    """
+    Queue a committed table version for flushing
+    changed_rows is the number of rows the write touched, used to estimate
+    how many bytes are waiting to be written
+    """
+    global _dirty_bytes
+    start()
+
+    with _condition:
+        _dirty[version.table] = version
+        _stale_stats[version.table] = version
+        _dirty_bytes += changed_rows * ROW_BYTES_ESTIMATE
+        if _dirty_bytes >= DIRTY_BYTES_LIMIT:
+            _condition.notify()
+
+
+def start():
+    """Start the maintenance thread if it is not running yet"""
+    global _thread, _stopping
+    with _condition:
+        if _thread is not None:
+            return
+        _stopping = False
+        _thread = threading.Thread(target=run, name="rdbms-maintenance", daemon=True)
+        _thread.start()
+
+
+def stop():
+    """Stop the maintenance thread and write out everything still dirty"""
+    global _thread, _stopping
+    with _condition:
+        thread = _thread
+        _stopping = True
+        _condition.notify()
+
+    if thread is not None:
+        thread.join()
+    checkpoint()
+
+    with _condition:
+        _thread = None
+
+
+# Final checkpoint at exit, registered once however often the thread restarts
+atexit.register(stop)
+
+
+def run():
+    last_stats = time.monotonic()
+
+    while True:
+        with _condition:
+            if not _stopping and _dirty_bytes < DIRTY_BYTES_LIMIT:
+                _condition.wait(FLUSH_INTERVAL)
+            if _stopping:
+                return
+
+        try:
+            flush()
+            if time.monotonic() - last_stats >= STATS_INTERVAL:
+                refresh_statistics()
+                last_stats = time.monotonic()
+        except Exception as e:
+            print(f"Checkpoint error: {e}")
+
+
+def flush():
+    """
+    Write every dirty table version to disk, then save the catalog
+    Returns the number of tables written
+    """
+    global _dirty_bytes
+
+    with _flush_lock:
+        with _condition:
+            pending = dict(_dirty)
+            _dirty.clear()
+            _dirty_bytes = 0
+
+        for table_name, version in pending.items():
+            try:
+                write_version(version)
+            except Exception:
+                # Keep the table dirty unless a newer version is queued
+                with _condition:
+                    _dirty.setdefault(table_name, version)
+                raise
+
+        flush_catalog()
+        return len(pending)
+
+
+def write_version(version):
+    """Write one table version's rows and indexes"""
+    table_name = version.table
+
+    # Compaction - large tables are stored without indentation
+    if len(version.rows) >= COMPACT_ROWS and table_format(table_name) != COMPACT_FORMAT:
+        set_table_format(table_name, COMPACT_FORMAT)
+        for key in [key for key in _flushed_secondary if key[0] == table_name]:
+            del _flushed_secondary[key]
+
+    save_rows(table_name, version.rows)
+
+    # A memory-mapped index is exactly what is already on disk
+    if not isinstance(version.index, SortedIndex):
+        save_index(table_name, version.index)
+
+    # Trigram indexes are only rewritten when a write changed them
+    for index_name, postings in version.secondary.items():
+        if _flushed_secondary.get((table_name, index_name)) is not postings:
+            save_secondary_index(table_name, index_name, postings)
+            _flushed_secondary[(table_name, index_name)] = postings
+
+
+def refresh_statistics():
+    """Recompute per-column distinct counts for tables changed since last time"""
+    with _condition:
+        stale = dict(_stale_stats)
+        _stale_stats.clear()
+
+    for table_name, version in stale.items():
+        distinct = {}
+        for row in version.rows:
+            for column, value in row.items():
+                distinct.setdefault(column, set()).add(value)
+        save_statistics(table_name, {column: len(values) for column, values in distinct.items()})
+
+    return len(stale)
+
+
+def checkpoint():
+    """
+    Flush all dirty tables and refresh statistics right now
+    Returns the number of tables written
+    """
+    flushed = flush()
+    refresh_statistics()
+    flush_catalog()
+    return flushed
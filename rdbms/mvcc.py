@@ -0,0 +1,212 @@
+"""
+Multi-version concurrency control for table data
+
+Every write to a table publishes a brand new TableVersion holding the full
+row list, primary key index and secondary (trigram) indexes. Versions are
+never modified after they are published, so a reader that pins a version
+sees the same rows and indexes for the whole statement no matter how many
+writes happen meanwhile.
+
+    with snapshot("users", "orders") as (users, orders):
+        ...  # users.rows / orders.index are stable here
+
+Writers to the same table are serialized with a per-table lock; readers
+never take it. Row dictionaries are shared between versions, so writers must
+replace a row with an updated copy instead of changing it in place.
+
+Superseded versions that are still pinned are kept in a retained list and
+dropped as soon as their last reader releases them.
+
+Each table also keeps a short change log of the primary keys touched by
+recent versions, so clients holding an older version can fetch just the
+rows that changed since.
+"""
+
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from rdbms.storage import (
+    load_rows, load_index, table_version, load_secondary_indexes, record_write
+)
+from rdbms.maintenance import mark_dirty
+
+
+class TableVersion:
+    """One immutable version of a table's rows and indexes"""
+
+    __slots__ = ("table", "version", "rows", "index", "secondary", "readers", "cache")
+
+    def __init__(self, table, version, rows, index, secondary):
+        self.table = table
+        self.version = version
+        self.rows = rows
+        self.index = index
+        self.secondary = secondary
+        self.readers = 0
+
+        # Structures derived from this version (e.g. primary key order),
+        # freed together with the version itself
+        self.cache = {}
+
+
+# Versions remembered per table by the change log
+CHANGELOG_SIZE = 1000
+
+
+class ChangeLog:
+    """Primary keys changed by each recent version of a table"""
+
+    def __init__(self, version):
+        # Changes after this version are fully known
+        self.start = version
+        self.entries = deque()
+
+    def record(self, version, keys):
+        if keys is None:
+            # The write did not say what it changed - forget the history
+            self.start = version
+            self.entries.clear()
+            return
+
+        self.entries.append((version, frozenset(keys)))
+        if len(self.entries) > CHANGELOG_SIZE:
+            self.start = self.entries.popleft()[0]
+
+    def keys_between(self, since, until):
+        """Keys changed after version since up to until, or None if unknown"""
+        if since < self.start or since > until:
+            return None
+
+        keys = set()
+        for version, changed in self.entries:
+            if since < version <= until:
+                keys.update(changed)
+        return keys
+
+
+# Guards the bookkeeping below - never held while doing I/O
+_registry_lock = threading.Lock()
+
+_current = {}      # table_name -> latest TableVersion
+_retained = {}     # (table_name, version) -> superseded but still pinned
+_write_locks = {}  # table_name -> lock serializing writers
+_changelogs = {}   # table_name -> ChangeLog
+
+
+def write_lock(table_name):
+    """Lock serializing writers of one table"""
+    with _registry_lock:
+        lock = _write_locks.get(table_name)
+        if lock is None:
+            lock = _write_locks[table_name] = threading.RLock()
+    return lock
+
+
+def latest(table_name):
+    """
+    Latest version of a table, loading it from disk on first access
+    Raises if the table does not exist
+    """
+    version = _current.get(table_name)
+    if version is not None:
+        return version
+
+    with write_lock(table_name):
+        version = _current.get(table_name)
+        if version is None:
+            version = TableVersion(
+                table_name,
+                table_version(table_name),
+                load_rows(table_name),
+                load_index(table_name),
+                load_secondary_indexes(table_name)
+            )
+            with _registry_lock:
+                _current[table_name] = version
+                _changelogs[table_name] = ChangeLog(version.version)
+    return version
+
+
+def pin(table_names):
+    """
+    Pin the latest version of each table
+    All versions are taken at the same instant, so a JOIN never sees one
+    table before a write and the other after it
+    """
+    for table_name in table_names:
+        latest(table_name)
+
+    with _registry_lock:
+        versions = tuple(_current[table_name] for table_name in table_names)
+        for version in versions:
+            version.readers += 1
+    return versions
+
+
+def release(versions):
+    """Unpin versions and drop superseded ones nobody reads any more"""
+    with _registry_lock:
+        for version in versions:
+            version.readers -= 1
+            if version.readers == 0:
+                _retained.pop((version.table, version.version), None)
+
+
+@contextmanager
+def snapshot(*table_names):
+    """Pin a consistent snapshot of tables for the duration of a statement"""
+    versions = pin(table_names)
+    try:
+        yield versions
+    finally:
+        release(versions)
+
+
+def commit(table_name, rows, index, secondary=None, changed=None):
+    """
+    Publish a new version of a table
+    secondary maps index names to postings; None keeps the secondary
+    indexes of the current version. changed is the set of primary keys
+    the write inserted, updated or deleted; None means unknown and resets
+    the change log. The caller must hold write_lock(table_name) and must
+    not modify anything it passed in afterwards
+
+    Nothing is written here - the version is handed to the maintenance
+    thread, which flushes it to disk in the background
+    """
+    old_version = _current.get(table_name)
+    if secondary is None:
+        secondary = old_version.secondary if old_version is not None else {}
+
+    version_number = record_write(table_name, len(rows))
+    new_version = TableVersion(table_name, version_number, rows, index, secondary)
+
+    with _registry_lock:
+        _current[table_name] = new_version
+        if old_version is not None and old_version.readers > 0:
+            _retained[(table_name, old_version.version)] = old_version
+
+        changelog = _changelogs.setdefault(table_name, ChangeLog(new_version.version))
+        changelog.record(new_version.version, changed)
+
+    mark_dirty(new_version, len(changed) if changed is not None else len(rows))
+    return new_version
+
+
+def changed_keys(table_name, since, until):
+    """
+    Primary keys changed after version since up to version until
+    Returns None when the change log no longer reaches back that far
+    """
+    with _registry_lock:
+        changelog = _changelogs.get(table_name)
+        if changelog is None:
+            return None
+        return changelog.keys_between(since, until)
+
+
+def retained_versions():
+    """Superseded versions still held by readers, as (table, version) pairs"""
+    with _registry_lock:
+        return sorted(_retained)
@@ -1,3 +1,6 @@
+import re
+
+
 def parse_create_table(query):
     """Parse CREATE TABLE statement"""
     tokens = query.strip(";").split()
@@ -36,6 +39,55 @@ def parse_create_table(query):
     }
 
 
+def parse_create_materialized_view(query):
+    """Parse CREATE MATERIALIZED VIEW ... AS SELECT ... JOIN statement"""
+    tokens = query.strip(";").split()
+    
+    if len(tokens) < 6 or tokens[4].upper() != "AS":
+        raise Exception("Invalid CREATE MATERIALIZED VIEW syntax")
+    
+    select = parse_select(" ".join(tokens[5:]))
+    
+    if select["type"] != "select_join":
+        raise Exception("Materialized views must be defined by a JOIN")
+    
+    if select["order_by"] or select["limit"] is not None:
+        raise Exception("ORDER BY and LIMIT are not supported in materialized views")
+    
+    return {
+        "type": "create_materialized_view",
+        "view": tokens[3],
+        "left": select["left"],
+        "right": select["right"],
+        "on": select["on"]
+    }
+
+
+def parse_create_index(query):
+    """Parse CREATE INDEX name ON table (column) USING TRIGRAM statement"""
+    match = re.fullmatch(
+        r"CREATE\s+INDEX\s+(\w+)\s+ON\s+(\w+)\s*\(\s*(\w+)\s*\)\s*(?:USING\s+(\w+))?",
+        query.strip().rstrip(";").strip(),
+        re.IGNORECASE
+    )
+    
+    if not match:
+        raise Exception("Invalid CREATE INDEX syntax")
+    
+    index_name, table_name, column, method = match.groups()
+    
+    if method is None:
+        raise Exception("CREATE INDEX requires USING TRIGRAM")
+    
+    return {
+        "type": "create_index",
+        "index": index_name,
+        "table": table_name,
+        "column": column,
+        "method": method.upper()
+    }
+
+
 def parse_insert_into(query):
     """Parse INSERT INTO statement"""
     tokens = query.strip(";").split()
@@ -71,12 +123,113 @@ def parse_insert_into(query):
     }
 
 
+def parse_order_by(tokens):
+    """
+    Split trailing ORDER BY / LIMIT clauses off a SELECT
+    Returns (remaining tokens, order_by, limit) where order_by is a list of
+    [column, "ASC"/"DESC"] pairs, or None when there is no ORDER BY
+    """
+    upper = [token.upper() for token in tokens]
+    order_by = None
+    limit = None
+    
+    if "LIMIT" in upper:
+        limit_idx = upper.index("LIMIT")
+        if limit_idx != len(tokens) - 2:
+            raise Exception("Invalid LIMIT syntax")
+        try:
+            limit = int(tokens[limit_idx + 1])
+        except ValueError:
+            raise Exception("LIMIT must be an integer")
+        if limit < 0:
+            raise Exception("LIMIT must not be negative")
+        tokens = tokens[:limit_idx]
+        upper = upper[:limit_idx]
+    
+    if "ORDER" in upper:
+        order_idx = upper.index("ORDER")
+        if order_idx + 1 >= len(upper) or upper[order_idx + 1] != "BY":
+            raise Exception("Invalid ORDER BY syntax")
+        
+        order_by = []
+        for item in " ".join(tokens[order_idx + 2:]).split(","):
+            parts = item.split()
+            if len(parts) == 1:
+                order_by.append([parts[0], "ASC"])
+            elif len(parts) == 2 and parts[1].upper() in ("ASC", "DESC"):
+                order_by.append([parts[0], parts[1].upper()])
+            else:
+                raise Exception("Invalid ORDER BY syntax")
+        tokens = tokens[:order_idx]
+    
+    return tokens, order_by, limit
+
+
+# Quoted LIKE pattern: runs to the first matching quote that ends a token
+LIKE_LITERAL = re.compile(r"\bLIKE\s+(['\"])(.*?)\1(?=\s|;|$)", re.IGNORECASE | re.DOTALL)
+
+
+def split_like_literal(query):
+    """
+    Take the quoted LIKE pattern out of a query before it is split into
+    tokens, so spaces and keywords such as ORDER or LIMIT inside the
+    pattern are kept as written
+    Returns (query with an empty literal in its place, pattern or None)
+    """
+    match = LIKE_LITERAL.search(query)
+    if match is None:
+        return query, None
+    
+    quote = match.group(1)
+    return query[:match.start(1)] + quote + quote + query[match.end():], match.group(2)
+
+
+def parse_where(tokens, like_pattern=None):
+    """
+    Split a trailing WHERE clause off a SELECT
+    Supports column = value and column LIKE 'pattern'
+    like_pattern is the pattern taken out by split_like_literal, if any
+    Returns (remaining tokens, where) where where is [column, operator, value]
+    """
+    upper = [token.upper() for token in tokens]
+    if "WHERE" not in upper:
+        return tokens, None
+    
+    where_idx = upper.index("WHERE")
+    where_clause = " ".join(tokens[where_idx + 1:])
+    
+    match = re.fullmatch(r"(\S+)\s+LIKE\s+(['\"])(.*)\2", where_clause, re.IGNORECASE)
+    if match:
+        pattern = match.group(3) if like_pattern is None else like_pattern
+        return tokens[:where_idx], [match.group(1), "LIKE", pattern]
+    
+    if "=" in where_clause:
+        where_column, where_value = where_clause.split("=", 1)
+        where_value = where_value.strip().strip('"\'')
+        
+        # Try to convert to int
+        try:
+            where_value = int(where_value)
+        except ValueError:
+            pass
+        
+        return tokens[:where_idx], [where_column.strip(), "=", where_value]
+    
+    raise Exception("Invalid WHERE syntax")
+
+
 def parse_select(query):
     """Parse SELECT statement"""
+    query, like_pattern = split_like_literal(query)
     tokens = query.strip(";").split()
+    tokens, order_by, limit = parse_order_by(tokens)
+    tokens, where = parse_where(tokens, like_pattern)
     
     if "JOIN" in tokens:
         # Handle SELECT with JOIN
+        if where is not None:
+            raise Exception("WHERE is not supported with JOIN")
+        
         join_idx = tokens.index("JOIN")
         on_idx = tokens.index("ON")
         
@@ -100,13 +253,18 @@ def parse_select(query):
             "type": "select_join",
             "left": tokens[3],
             "right": tokens[join_idx + 1],
-            "on": [left_key.strip(), right_key.strip()]
+            "on": [left_key.strip(), right_key.strip()],
+            "order_by": order_by,
+            "limit": limit
         }
     else:
         # Simple SELECT
         return {
             "type": "select",
-            "table": tokens[3]
+            "table": tokens[3],
+            "where": where,
+            "order_by": order_by,
+            "limit": limit
         }
 
 
@@ -191,6 +349,29 @@ def parse_delete_from(query):
     }
 
 
+def parse_show_tables(query):
+    """Parse SHOW TABLES statement"""
+    tokens = query.strip(";").split()
+
+    if len(tokens) != 2 or tokens[1].upper() != "TABLES":
+        raise Exception("Invalid SHOW TABLES syntax")
+
+    return {"type": "show_tables"}
+
+
+def parse_describe(query):
+    """Parse DESCRIBE statement"""
+    tokens = query.strip(";").split()
+
+    if len(tokens) != 2:
+        raise Exception("Invalid DESCRIBE syntax")
+
+    return {
+        "type": "describe",
+        "table": tokens[1]
+    }
+
+
 def parse(query):
     """Main parser function - routes to specific parsers"""
     query = query.strip()
@@ -200,6 +381,10 @@ def parse(query):
     
     if query.upper().startswith("CREATE TABLE"):
         return parse_create_table(query)
+    elif query.upper().startswith("CREATE INDEX"):
+        return parse_create_index(query)
+    elif query.upper().startswith("CREATE MATERIALIZED VIEW"):
+        return parse_create_materialized_view(query)
     elif query.upper().startswith("INSERT INTO"):
         return parse_insert_into(query)
     elif query.upper().startswith("SELECT"):
@@ -208,5 +393,11 @@ def parse(query):
         return parse_update(query)
     elif query.upper().startswith("DELETE FROM"):
         return parse_delete_from(query)
+    elif query.upper().strip(";").strip() == "CHECKPOINT":
+        return {"type": "checkpoint"}
+    elif query.upper().startswith("SHOW"):
+        return parse_show_tables(query)
+    elif query.upper().startswith("DESCRIBE"):
+        return parse_describe(query)
     else:
         raise Exception(f"Unsupported query type: {query[:20]}...")
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""
+Wire protocol shared by the network server and client
+
+Every message is a compact JSON object prefixed with its length as a
+4-byte big-endian unsigned integer:
+
+    [length][{"id": 1, "sql": "SELECT * FROM users;"}]
+
+Requests carry an "id" chosen by the client and the SQL text. The server
+answers each request with zero or more row batches followed by exactly one
+terminal frame, always in the order the requests were received:
+
+    {"id": 1, "rows": [...]}                 streamed row batch
+    {"id": 1, "done": true, "count": 42}     end of a row result
+    {"id": 1, "done": true, "result": "..."} status message (INSERT, UPDATE, ...)
+    {"id": 1, "error": "..."}                statement failed
+"""
+
+import json
+import struct
+
+HEADER = struct.Struct(">I")
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+
+def encode_frame(message):
+    """Serialize a message into a length-prefixed frame"""
+    payload = json.dumps(message, separators=(",", ":")).encode("utf-8")
+    if len(payload) > MAX_FRAME_SIZE:
+        raise Exception(f"Frame of {len(payload)} bytes exceeds the protocol limit")
+    return HEADER.pack(len(payload)) + payload
+
+
+async def read_frame(reader):
+    """
+    Read one frame from an asyncio StreamReader
+    Raises asyncio.IncompleteReadError when the peer closes the connection
+    """
+    header = await reader.readexactly(HEADER.size)
+    (length,) = HEADER.unpack(header)
+
+    if length > MAX_FRAME_SIZE:
+        raise Exception(f"Frame of {length} bytes exceeds the protocol limit")
+
+    payload = await reader.readexactly(length)
+    return json.loads(payload)
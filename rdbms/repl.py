@@ -3,12 +3,57 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from rdbms.engine import (
-    create_table, insert_into, select, select_join, 
-    update, delete_from
+    create_table, insert_into, select, select_join, iter_select, iter_select_join,
+    update, delete_from, show_tables, describe_table,
+    create_materialized_view, create_index, checkpoint
 )
 from rdbms.parser import parse
 
 
+def join_keys(command):
+    """JOIN condition columns without their table.column prefixes"""
+    left_key, right_key = command["on"]
+    
+    # Handle table.column format in JOIN conditions
+    if "." in left_key:
+        left_key = left_key.split(".")[1]
+    if "." in right_key:
+        right_key = right_key.split(".")[1]
+    
+    return left_key, right_key
+
+
+def stream(command):
+    """
+    Iterator over the result rows of a SELECT, produced as they are read
+    Returns None for commands that do not return rows
+    """
+    if not command:
+        return None
+    
+    if command["type"] == "select":
+        return iter_select(
+            command["table"],
+            ordered_by_pk=True,
+            order_by=command.get("order_by"),
+            limit=command.get("limit"),
+            where=command.get("where")
+        )
+    
+    if command["type"] == "select_join":
+        left_key, right_key = join_keys(command)
+        return iter_select_join(
+            command["left"],
+            command["right"],
+            left_key,
+            right_key,
+            order_by=command.get("order_by"),
+            limit=command.get("limit")
+        )
+    
+    return None
+
+
 def execute(command):
     """Execute parsed command by routing to appropriate engine function"""
     if not command:
@@ -23,18 +68,42 @@ def execute(command):
         return insert_into(command["table"], command["values"])
     
     elif cmd_type == "select":
-        return select(command["table"], ordered_by_pk=True)
+        return select(
+            command["table"],
+            ordered_by_pk=True,
+            order_by=command.get("order_by"),
+            limit=command.get("limit"),
+            where=command.get("where")
+        )
     
     elif cmd_type == "select_join":
-        left_key, right_key = command["on"]
-        
-        # Handle table.column format in JOIN conditions
-        if "." in left_key:
-            left_key = left_key.split(".")[1]
-        if "." in right_key:
-            right_key = right_key.split(".")[1]
-            
-        return select_join(command["left"], command["right"], left_key, right_key)
+        left_key, right_key = join_keys(command)
+        return select_join(
+            command["left"],
+            command["right"],
+            left_key,
+            right_key,
+            order_by=command.get("order_by"),
+            limit=command.get("limit")
+        )
+    
+    elif cmd_type == "create_materialized_view":
+        left_key, right_key = join_keys(command)
+        return create_materialized_view(
+            command["view"],
+            command["left"],
+            command["right"],
+            left_key,
+            right_key
+        )
+    
+    elif cmd_type == "create_index":
+        return create_index(
+            command["table"],
+            command["index"],
+            command["column"],
+            command["method"]
+        )
     
     elif cmd_type == "update":
         return update(
@@ -52,6 +121,15 @@ def execute(command):
             command["where_value"]
         )
     
+    elif cmd_type == "checkpoint":
+        return checkpoint()
+    
+    elif cmd_type == "show_tables":
+        return show_tables()
+    
+    elif cmd_type == "describe":
+        return describe_table(command["table"])
+    
     else:
         raise Exception(f"Unknown command type: {cmd_type}")
 
@@ -86,7 +164,7 @@ def repl():
     """Interactive REPL for the RDBMS"""
     print("🗄️  Pesa Pal RDBMS - Interactive Shell")
     print("Type 'exit' or 'quit' to leave")
-    print("Supported: CREATE TABLE, INSERT INTO, SELECT, UPDATE, DELETE FROM, JOIN")
+    print("Supported: CREATE TABLE, INSERT INTO, SELECT, UPDATE, DELETE FROM, JOIN, SHOW TABLES, DESCRIBE, CREATE MATERIALIZED VIEW, CREATE INDEX, CHECKPOINT")
     print()
     
     while True:
@@ -0,0 +1,221 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from rdbms import maintenance, storage
+from rdbms.parser import parse
+from rdbms.protocol import encode_frame, read_frame
+from rdbms.repl import execute, stream
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5433
+
+# Rows sent per frame when streaming a result set
+BATCH_SIZE = 100
+
+# Requests a single connection may queue before we stop reading from it
+PIPELINE_DEPTH = 64
+
+# Threads executing statements - readers work on MVCC snapshots, so
+# statements from different connections can run side by side
+WORKERS = 4
+
+
+class DatabaseServer:
+    """
+    Asyncio TCP server hosting one long-lived database handle
+    Clients send SQL over the length-prefixed protocol in rdbms/protocol.py
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, batch_size=BATCH_SIZE,
+                 workers=WORKERS):
+        self.host = host
+        self.port = port
+        self.batch_size = batch_size
+
+        # Statements run on worker threads while the event loop keeps
+        # serving sockets; each connection still executes in request order
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rdbms")
+        self.server = None
+        self.connections = {}
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        return self.server
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+        # Hang up on idle clients so their handlers see EOF and finish
+        for writer in self.connections.values():
+            writer.close()
+        await asyncio.gather(*self.connections, return_exceptions=True)
+        self.executor.shutdown(wait=True)
+
+        # Nothing is executing any more - write out whatever is still dirty
+        maintenance.checkpoint()
+
+    async def handle_client(self, reader, writer):
+        """
+        Read requests from one connection
+        Reading continues while earlier requests are still executing, so a
+        client can pipeline many statements without waiting for replies
+        """
+        self.connections[asyncio.current_task()] = writer
+        queue = asyncio.Queue(maxsize=PIPELINE_DEPTH)
+        worker = asyncio.create_task(self.process_requests(queue, writer))
+
+        try:
+            while True:
+                try:
+                    message = await read_frame(reader)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                await queue.put(message)
+        except Exception as e:
+            # Malformed frame - the stream can no longer be trusted
+            writer.write(encode_frame({"id": None, "error": str(e)}))
+        finally:
+            if queue.full():
+                # Worker is stuck behind a client that stopped reading
+                worker.cancel()
+            else:
+                queue.put_nowait(None)
+            await asyncio.gather(worker, return_exceptions=True)
+            self.connections.pop(asyncio.current_task(), None)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def process_requests(self, queue, writer):
+        """Execute queued requests in arrival order and write their replies"""
+        while True:
+            message = await queue.get()
+            if message is None:
+                break
+            try:
+                await self.run_request(message, writer)
+            except ConnectionError:
+                # Client went away - drain the queue without executing
+                continue
+            except Exception as e:
+                # Still answer the request, or the client waits on it forever
+                request_id = message.get("id") if isinstance(message, dict) else None
+                writer.write(encode_frame({"id": request_id, "error": str(e)}))
+
+    async def run_request(self, message, writer):
+        request_id = message.get("id") if isinstance(message, dict) else None
+        loop = asyncio.get_running_loop()
+
+        try:
+            sql = message["sql"]
+            rows, result = await loop.run_in_executor(self.executor, self.execute_sql, sql)
+        except Exception as e:
+            writer.write(encode_frame({"id": request_id, "error": str(e)}))
+            await writer.drain()
+            return
+
+        if rows is None:
+            self.reply(writer, {"id": request_id, "done": True, "result": result})
+            await writer.drain()
+            return
+
+        # Pull rows from the query a batch at a time, so a large result is
+        # never built in memory; drain() holds the query back while the
+        # client is slow to read
+        count = 0
+        try:
+            while True:
+                try:
+                    batch = await loop.run_in_executor(self.executor, self.next_batch, rows)
+                except Exception as e:
+                    writer.write(encode_frame({"id": request_id, "error": str(e)}))
+                    break
+                if not batch:
+                    writer.write(encode_frame({"id": request_id, "done": True, "count": count}))
+                    break
+                count += len(batch)
+                if not self.reply(writer, {"id": request_id, "rows": batch}):
+                    break
+                await writer.drain()
+        finally:
+            # Unpins the query's snapshot even if the client went away; a
+            # batch still running after cancellation closes it when it is
+            # garbage collected instead
+            try:
+                rows.close()
+            except ValueError:
+                pass
+        await writer.drain()
+
+    def reply(self, writer, message):
+        """
+        Write one reply frame
+        A reply that cannot be encoded, e.g. a batch over the frame size
+        limit, is answered with an error frame instead; returns False then
+        """
+        try:
+            frame = encode_frame(message)
+        except Exception as e:
+            writer.write(encode_frame({"id": message["id"], "error": str(e)}))
+            return False
+        writer.write(frame)
+        return True
+
+    def execute_sql(self, sql):
+        """
+        Parse and start one statement on a worker thread
+        Returns (rows, None) for queries, where rows is a generator of
+        result rows, and (None, result) for every other statement
+        """
+        command = parse(sql)
+        rows = stream(command)
+        if rows is not None:
+            return rows, None
+        return None, execute(command)
+
+    def next_batch(self, rows):
+        """Next batch of rows from a running query, empty when it is done"""
+        return list(islice(rows, self.batch_size))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="MiniRDBMS network server")
+    arg_parser.add_argument("--host", default=DEFAULT_HOST)
+    arg_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    arg_parser.add_argument("--data-dir", default=storage.DATA_DIR)
+    arg_parser.add_argument("--workers", type=int, default=WORKERS)
+    arg_parser.add_argument("--flush-interval", type=float, default=maintenance.FLUSH_INTERVAL,
+                            help="seconds between background checkpoints")
+    arg_parser.add_argument("--dirty-bytes", type=int, default=maintenance.DIRTY_BYTES_LIMIT,
+                            help="unflushed bytes that trigger an early checkpoint")
+    args = arg_parser.parse_args()
+
+    storage.DATA_DIR = args.data_dir
+    maintenance.configure(flush_interval=args.flush_interval, dirty_bytes=args.dirty_bytes)
+    server = DatabaseServer(args.host, args.port, workers=args.workers)
+
+    print(f"🗄️  MiniRDBMS server listening on {args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("\nServer stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,39 @@
 import json
 import os
+import threading
+import time
+
+from rdbms.keyindex import write_index, open_index, INT_KEYS, TEXT_KEYS
+from rdbms.trigram import Postings
 
 DATA_DIR = "data"
 
+CATALOG_VERSION = 1
+
+# Storage format whose files are written without indentation; maintenance
+# switches large tables to it
+COMPACT_FORMAT = "json-compact"
+
+# The catalog is read once per process and then served from memory.
+# Table rows and indexes are loaded lazily on first access and kept as
+# versions by rdbms/mvcc.py; rdbms/maintenance.py writes them back.
+_catalog = None
+_catalog_dirty = False
+_catalog_lock = threading.RLock()
+
+# Orders catalog file writes, which happen outside _catalog_lock so
+# statements updating statistics never wait for the disk
+_catalog_write_lock = threading.Lock()
+
 def ensure_data_dir():
     if not os.path.exists(DATA_DIR):
         os.makedirs(DATA_DIR)
         
 
+def catalog_path():
+    return os.path.join(DATA_DIR, "catalog.json")
+
+
 def schema_path(table_name):
     return os.path.join(DATA_DIR, f"{table_name}_schema.json")
 
@@ -17,46 +43,315 @@ def row_path(table_name):
 
 
 def index_path(table_name):
+    return os.path.join(DATA_DIR, f"{table_name}_pk_index.bin")
+
+
+def legacy_index_path(table_name):
     return os.path.join(DATA_DIR, f"{table_name}_pk_index.json")
 
 
-def save_schema(table_name, schema):
+def secondary_index_path(table_name, index_name):
+    return os.path.join(DATA_DIR, f"{table_name}_{index_name}_index.json")
+
+
+def load_catalog():
+    """
+    Return the catalog, reading catalog.json on first use only
+    Data directories created before the catalog existed are migrated
+    from their per-table schema files once, and temporary files left by
+    an interrupted write are removed
+    """
+    global _catalog
+    if _catalog is not None:
+        return _catalog
+
+    migrated = False
+    with _catalog_lock:
+        if _catalog is None:
+            # Every write goes through the catalog, so nothing of ours is
+            # writing yet and any temporary file is left from a crash
+            remove_temp_files()
+            
+            path = catalog_path()
+            if os.path.exists(path):
+                with open(path) as f:
+                    _catalog = json.load(f)
+            else:
+                _catalog = build_catalog()
+                migrated = bool(_catalog["tables"])
+    
+    # Never save while holding _catalog_lock - see save_catalog
+    if migrated:
+        save_catalog()
+    return _catalog
+
+
+def save_catalog():
+    """
+    Write the catalog file
+    Only serializing happens under _catalog_lock; callers must not hold
+    it, since the file write waits for _catalog_write_lock
+    """
+    global _catalog_dirty
+    with _catalog_write_lock:
+        with _catalog_lock:
+            text = json.dumps(load_catalog(), indent=2)
+            _catalog_dirty = False
+        write_text(catalog_path(), text)
+
+
+def flush_catalog():
+    """Save the catalog if statistics changed since it was last saved"""
+    if _catalog_dirty:
+        save_catalog()
+
+
+def build_catalog():
+    """Build a catalog from legacy <table>_schema.json files"""
+    catalog = {"version": CATALOG_VERSION, "tables": {}}
+    if not os.path.exists(DATA_DIR):
+        return catalog
+
+    for file_name in sorted(os.listdir(DATA_DIR)):
+        if not file_name.endswith("_schema.json"):
+            continue
+        with open(os.path.join(DATA_DIR, file_name)) as f:
+            schema = json.load(f)
+        table_name = schema["table"]
+        entry = catalog_entry(schema)
+        entry["stats"]["row_count"] = len(read_json(row_path(table_name), []))
+        if os.path.exists(row_path(table_name)):
+            entry["stats"]["modified_at"] = os.path.getmtime(row_path(table_name))
+        catalog["tables"][table_name] = entry
+
+    return catalog
+
+
+def catalog_entry(schema):
+    return {
+        "schema": schema,
+        "format": "json",
+        "indexes": {
+            "pk": {
+                "column": schema["primary_key"],
+                "type": "sorted",
+                "file": os.path.basename(index_path(schema["table"]))
+            }
+        },
+        "stats": {"row_count": 0, "version": 0, "modified_at": time.time()}
+    }
+
+
+def table_exists(table_name):
+    return table_name in load_catalog()["tables"]
+
+
+def list_tables():
+    with _catalog_lock:
+        return sorted(load_catalog()["tables"])
+
+
+def table_entry(table_name):
+    tables = load_catalog()["tables"]
+    if table_name not in tables:
+        raise Exception(f"Table '{table_name}' does not exist")
+    return tables[table_name]
+
+
+def table_version(table_name):
+    """Counter bumped on every write to the table's rows"""
+    return table_entry(table_name)["stats"]["version"]
+
+
+def table_modified(table_name):
+    """Unix timestamp of the last write to the table's rows"""
+    return table_entry(table_name)["stats"].get("modified_at", 0.0)
+
+
+def record_write(table_name, row_count):
+    """
+    Update a table's statistics for a new version held in memory
+    Returns the new version number; the catalog is saved at the next
+    checkpoint
+    """
+    global _catalog_dirty
+    with _catalog_lock:
+        stats = table_entry(table_name)["stats"]
+        stats["row_count"] = row_count
+        stats["version"] += 1
+        stats["modified_at"] = time.time()
+        _catalog_dirty = True
+        return stats["version"]
+
+
+def save_statistics(table_name, distinct):
+    """Store per-column distinct value counts gathered by maintenance"""
+    global _catalog_dirty
+    with _catalog_lock:
+        table_entry(table_name)["stats"]["distinct"] = distinct
+        _catalog_dirty = True
+
+
+def table_format(table_name):
+    return table_entry(table_name).get("format", "json")
+
+
+def set_table_format(table_name, file_format):
+    global _catalog_dirty
+    with _catalog_lock:
+        table_entry(table_name)["format"] = file_format
+        _catalog_dirty = True
+
+
+def write_json(path, data, compact=False):
+    """
+    Write a JSON file atomically
+    Data goes to a temporary file first and is then renamed over the old
+    file, so no reader ever sees a half-written table
+    """
+    if compact:
+        write_text(path, json.dumps(data, separators=(",", ":")))
+    else:
+        write_text(path, json.dumps(data, indent=2))
+
+
+def write_text(path, text):
+    """Write a text file atomically through a temporary file"""
     ensure_data_dir()
-    with open(schema_path(table_name), "w") as f:
-        json.dump(schema, f, indent=2)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
 
 
-def load_schema(table_name):
-    path = schema_path(table_name)
+def remove_temp_files():
+    """Delete temporary files left behind by an interrupted write"""
+    if not os.path.exists(DATA_DIR):
+        return 0
+    removed = 0
+    for file_name in os.listdir(DATA_DIR):
+        if file_name.endswith((".json.tmp", ".bin.tmp")):
+            os.remove(os.path.join(DATA_DIR, file_name))
+            removed += 1
+    return removed
+
+
+def read_json(path, default):
     if not os.path.exists(path):
-        raise Exception(f"Table '{table_name}' does not exist")
+        return default
     with open(path) as f:
         return json.load(f)
 
 
+def save_schema(table_name, schema):
+    with _catalog_lock:
+        tables = load_catalog()["tables"]
+        if table_name in tables:
+            tables[table_name]["schema"] = schema
+        else:
+            tables[table_name] = catalog_entry(schema)
+    save_catalog()
+
+
+def load_schema(table_name):
+    return table_entry(table_name)["schema"]
+
+
+def save_index_definition(table_name, index_name, definition):
+    """Register a secondary index of a table in the catalog"""
+    definition = dict(definition, file=os.path.basename(secondary_index_path(table_name, index_name)))
+    with _catalog_lock:
+        table_entry(table_name)["indexes"][index_name] = definition
+    save_catalog()
+
+
+def secondary_indexes(table_name):
+    """Catalog definitions of a table's secondary (non primary key) indexes"""
+    with _catalog_lock:
+        indexes = table_entry(table_name)["indexes"]
+        return {name: dict(definition) for name, definition in indexes.items() if name != "pk"}
+
+
+def save_view_definition(view_name, definition):
+    """Record the JOIN a materialized view is maintained from"""
+    with _catalog_lock:
+        table_entry(view_name)["view"] = definition
+    save_catalog()
+
+
+def views_on(table_name):
+    """Materialized views that depend on a base table"""
+    with _catalog_lock:
+        views = []
+        for name, entry in load_catalog()["tables"].items():
+            definition = entry.get("view")
+            if definition and table_name in (definition["left"], definition["right"]):
+                views.append(name)
+        return views
+
+
 def save_rows(table_name, rows):
-    ensure_data_dir()
-    with open(row_path(table_name), "w") as f:
-        json.dump(rows, f, indent=2)
+    compact = table_format(table_name) == COMPACT_FORMAT
+    write_json(row_path(table_name), rows, compact)
 
 
 def load_rows(table_name):
-    path = row_path(table_name)
-    if not os.path.exists(path):
-        return []
-    with open(path) as f:
-        return json.load(f)
+    return read_json(row_path(table_name), [])
 
 
 def save_index(table_name, index):
-    ensure_data_dir()
-    with open(index_path(table_name), "w") as f:
-        json.dump(index, f, indent=2)
+    """Persist the primary key index in the binary format of rdbms/keyindex.py"""
+    global _catalog_dirty
+    schema = load_schema(table_name)
+    pk = schema["primary_key"]
+    key_type = None
+    if pk is not None:
+        key_type = TEXT_KEYS if schema["columns"][pk]["type"] == "TEXT" else INT_KEYS
+    write_index(index_path(table_name), index, key_type)
+
+    # Tables from before the binary format switch over on first save
+    definition = {"type": "sorted", "file": os.path.basename(index_path(table_name))}
+    with _catalog_lock:
+        pk_index = table_entry(table_name)["indexes"]["pk"]
+        if any(pk_index.get(key) != value for key, value in definition.items()):
+            pk_index.update(definition)
+            _catalog_dirty = True
+    if os.path.exists(legacy_index_path(table_name)):
+        os.remove(legacy_index_path(table_name))
 
 
 def load_index(table_name):
-    path = index_path(table_name)
-    if not os.path.exists(path):
-        return {}
-    with open(path) as f:
-        return json.load(f)
\ No newline at end of file
+    """
+    Load the primary key index of a table
+    Binary index files are memory-mapped; legacy JSON indexes with
+    stringified keys are converted back to the primary key's type
+    """
+    if os.path.exists(index_path(table_name)):
+        return open_index(index_path(table_name))
+
+    data = read_json(legacy_index_path(table_name), {})
+    schema = load_schema(table_name)
+    pk = schema["primary_key"]
+    if pk is not None and schema["columns"][pk]["type"] == "INT":
+        return {int(key): position for key, position in data.items()}
+    return data
+
+
+def save_secondary_index(table_name, index_name, postings):
+    """Persist trigram posting lists as {trigram: [primary keys]}"""
+    data = {trigram: sorted(keys) for trigram, keys in postings.items()}
+    compact = table_format(table_name) == COMPACT_FORMAT
+    write_json(secondary_index_path(table_name, index_name), data, compact)
+
+
+def load_secondary_index(table_name, index_name):
+    data = read_json(secondary_index_path(table_name, index_name), {})
+    return Postings({trigram: frozenset(keys) for trigram, keys in data.items()})
+
+
+def load_secondary_indexes(table_name):
+    """Load every secondary index of a table, keyed by index name"""
+    return {
+        index_name: load_secondary_index(table_name, index_name)
+        for index_name in secondary_indexes(table_name)
+    }
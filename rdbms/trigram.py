@@ -0,0 +1,261 @@
+"""
+Trigram indexing for LIKE searches on TEXT columns
+
+A trigram index maps every 3-character substring of a column value to the
+primary keys of the rows containing it (a posting list). Values are padded
+with start/end markers so anchored patterns such as 'ab%' still produce
+trigrams:
+
+    "Sarah" -> {"\\x02\\x02S", "\\x02Sa", "Sar", "ara", "rah", "ah\\x03"}
+
+A LIKE pattern is split on its wildcards; every trigram of its literal parts
+must occur in a matching value, so intersecting their posting lists gives a
+small candidate set that is then verified against the real pattern.
+
+A backslash escapes the wildcards, so 'ann\\_lee%' matches values starting
+with "ann_lee".
+
+Posting lists are frozensets shared between table versions; a write only
+records the keys it added and removed (see Postings), so a published table
+version never sees its index change and writes stay cheap even for
+trigrams that occur in almost every row.
+"""
+
+import re
+
+START = "\x02\x02"
+END = "\x03"
+
+# Makes the next character of a LIKE pattern literal
+ESCAPE = "\\"
+
+
+def trigrams(value):
+    """Set of trigrams of a column value"""
+    padded = START + value + END
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def split_pattern(pattern):
+    """
+    Split a LIKE pattern into (wildcard, text) parts
+    Wildcards are ("%" or "_", True) and literal runs (text, False); a
+    backslash makes the next character literal, so \\% and \\_ match a
+    real % or _
+    """
+    parts = []
+    literal = ""
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == ESCAPE and i + 1 < len(pattern):
+            literal += pattern[i + 1]
+            i += 2
+            continue
+        if char in "%_":
+            if literal:
+                parts.append((literal, False))
+                literal = ""
+            parts.append((char, True))
+        else:
+            literal += char
+        i += 1
+    if literal:
+        parts.append((literal, False))
+    return parts
+
+
+def escape_like(text):
+    """Escape text so a LIKE pattern matches it literally"""
+    return text.replace(ESCAPE, ESCAPE * 2).replace("%", ESCAPE + "%").replace("_", ESCAPE + "_")
+
+
+def pattern_trigrams(pattern):
+    """
+    Trigrams every value matching a LIKE pattern must contain
+    Returns an empty set when the pattern has no literal run long enough
+    """
+    parts = split_pattern(pattern)
+    if not parts:
+        return set()
+    
+    # Anchored ends are padded like the values they must match
+    literals = [None if wildcard else text for text, wildcard in parts]
+    if literals[0] is not None:
+        literals[0] = START + literals[0]
+    if literals[-1] is not None:
+        literals[-1] = literals[-1] + END
+
+    result = set()
+    for literal in literals:
+        if literal is None:
+            continue
+        for i in range(len(literal) - 2):
+            result.add(literal[i:i + 3])
+    return result
+
+
+def like_matcher(pattern):
+    """
+    Compile a LIKE pattern into a predicate on strings
+    % matches any run of characters and _ exactly one; matching is case
+    sensitive
+    """
+    parts = split_pattern(pattern)
+    literals = [text for text, wildcard in parts if not wildcard]
+    
+    if ("_", True) not in parts and len(literals) <= 1:
+        # Plain substring, prefix, suffix and exact patterns
+        body = literals[0] if literals else ""
+        starts = parts[:1] == [("%", True)]
+        ends = parts[-1:] == [("%", True)] and len(parts) > 1
+        if starts and ends:
+            return lambda value: body in value
+        if ends:
+            return lambda value: value.startswith(body)
+        if starts:
+            return lambda value: value.endswith(body)
+        return lambda value: value == body
+
+    regex = "".join(
+        re.escape(text) if not wildcard else ".*" if text == "%" else "."
+        for text, wildcard in parts
+    )
+    compiled = re.compile(regex, re.DOTALL)
+    return lambda value: compiled.fullmatch(value) is not None
+
+
+# Pending per-version changes after which update_postings folds them into
+# fresh base posting lists
+MERGE_THRESHOLD = 4096
+
+
+class Postings:
+    """
+    Posting lists of one version of a trigram index
+    Large base lists are shared between versions; each version adds small
+    sets of keys added to and removed from them, so a write never copies
+    the posting list of a common trigram. The effective list of a trigram
+    is (base - removed) | added
+    """
+
+    __slots__ = ("base", "added", "removed", "pending")
+
+    def __init__(self, base, added=None, removed=None, pending=0):
+        self.base = base
+        self.added = added or {}
+        self.removed = removed or {}
+        self.pending = pending
+
+    def keys_for(self, trigram):
+        """Effective posting list of a trigram"""
+        keys = self.base.get(trigram, frozenset())
+        removed = self.removed.get(trigram)
+        if removed:
+            keys = keys - removed
+        added = self.added.get(trigram)
+        if added:
+            keys = keys | added
+        return keys
+
+    def estimate(self, trigram):
+        """Upper bound on the length of a trigram's posting list"""
+        return len(self.base.get(trigram, ())) + len(self.added.get(trigram, ()))
+
+    def contains(self, trigram, key):
+        if key in self.added.get(trigram, ()):
+            return True
+        return key in self.base.get(trigram, ()) and key not in self.removed.get(trigram, ())
+
+    def items(self):
+        """(trigram, posting list) pairs, skipping empty lists"""
+        for trigram in self.base.keys() | self.added.keys():
+            keys = self.keys_for(trigram)
+            if keys:
+                yield trigram, keys
+
+    def merged(self):
+        """Equivalent postings with all changes folded into the base lists"""
+        base = dict(self.base)
+        for trigram in self.added.keys() | self.removed.keys():
+            keys = self.keys_for(trigram)
+            if keys:
+                base[trigram] = keys
+            else:
+                base.pop(trigram, None)
+        return Postings(base)
+
+
+def build_postings(rows, column, pk):
+    """Build the posting lists of a column from scratch"""
+    postings = {}
+    for row in rows:
+        for trigram in trigrams(row[column]):
+            postings.setdefault(trigram, set()).add(row[pk])
+    return Postings({trigram: frozenset(keys) for trigram, keys in postings.items()})
+
+
+def update_postings(postings, column, pk, removed, added):
+    """
+    Return new postings with removed rows taken out and added rows put in
+    Only the small change sets of touched trigrams are copied; rows whose
+    indexed value did not change are skipped
+    """
+    old_values = {row[pk]: row[column] for row in removed}
+    new_values = {row[pk]: row[column] for row in added}
+    unchanged = {key for key, value in new_values.items() if old_values.get(key, None) == value}
+    
+    base = postings.base
+    added_keys = dict(postings.added)
+    removed_keys = dict(postings.removed)
+    pending = postings.pending
+    
+    for key, value in old_values.items():
+        if key in unchanged:
+            continue
+        for trigram in trigrams(value):
+            if key in added_keys.get(trigram, ()):
+                added_keys[trigram] = added_keys[trigram] - {key}
+            if key in base.get(trigram, ()):
+                removed_keys[trigram] = removed_keys.get(trigram, frozenset()) | {key}
+            pending += 1
+    
+    for key, value in new_values.items():
+        if key in unchanged:
+            continue
+        for trigram in trigrams(value):
+            if key in removed_keys.get(trigram, ()):
+                removed_keys[trigram] = removed_keys[trigram] - {key}
+            if key not in base.get(trigram, ()):
+                added_keys[trigram] = added_keys.get(trigram, frozenset()) | {key}
+            pending += 1
+    
+    # No indexed value changed - keep the same postings, so maintenance
+    # sees the index as unchanged and does not rewrite its file
+    if pending == postings.pending:
+        return postings
+    
+    result = Postings(base, added_keys, removed_keys, pending)
+    if pending >= MERGE_THRESHOLD:
+        result = result.merged()
+    return result
+
+
+def candidates(postings, pattern):
+    """
+    Primary keys of rows that may match a LIKE pattern
+    Returns None when the pattern cannot be narrowed through the index
+    """
+    needed = pattern_trigrams(pattern)
+    if not needed:
+        return None
+
+    # Start from the shortest posting list and check the remaining
+    # trigrams key by key, without building their (possibly huge) lists
+    ordered = sorted(needed, key=postings.estimate)
+    result = set(postings.keys_for(ordered[0]))
+    for trigram in ordered[1:]:
+        if not result:
+            break
+        result = {key for key in result if postings.contains(trigram, key)}
+    return result
@@ -0,0 +1,28 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from rdbms import maintenance, mvcc, storage
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """
+    A fresh, empty database in a temporary directory
+    Resets the process-wide catalog, table versions and maintenance queues
+    """
+    monkeypatch.setattr(storage, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(storage, "_catalog", None)
+    monkeypatch.setattr(storage, "_catalog_dirty", False)
+
+    for name in ("_current", "_retained", "_write_locks", "_changelogs"):
+        monkeypatch.setattr(mvcc, name, {})
+    for name in ("_dirty", "_stale_stats", "_flushed_secondary"):
+        monkeypatch.setattr(maintenance, name, {})
+
+    yield tmp_path
+
+    # Write everything out while DATA_DIR still points at tmp_path
+    maintenance.checkpoint()
@@ -0,0 +1,123 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+
+import pytest
+
+from rdbms import maintenance, mvcc, storage
+from rdbms.engine import (
+    create_table, create_materialized_view, insert_into, select, show_tables, describe_table
+)
+from rdbms.parser import parse
+from rdbms.repl import execute
+
+USERS = {
+    "id": {"type": "INT", "primary_key": True},
+    "name": {"type": "TEXT"},
+    "email": {"type": "TEXT", "unique": True}
+}
+ORDERS = {
+    "id": {"type": "INT", "primary_key": True},
+    "user_id": {"type": "INT"}
+}
+
+
+def write_legacy_table(data_dir, table_name, columns, rows):
+    schema = {"table": table_name, "columns": columns, "primary_key": "id"}
+    (data_dir / f"{table_name}_schema.json").write_text(json.dumps(schema))
+    (data_dir / f"{table_name}_rows.json").write_text(json.dumps(rows))
+    index = {str(row["id"]): pos for pos, row in enumerate(rows)}
+    (data_dir / f"{table_name}_pk_index.json").write_text(json.dumps(index))
+
+
+def reopen():
+    """Forget everything held in memory, as a new process would"""
+    maintenance.checkpoint()
+    storage._catalog = None
+    mvcc._current.clear()
+    mvcc._changelogs.clear()
+
+
+def test_legacy_schema_files_are_migrated(database):
+    rows = [{"id": 2, "name": "bob", "email": "b@x"}, {"id": 1, "name": "ann", "email": "a@x"}]
+    write_legacy_table(database, "users", USERS, rows)
+    write_legacy_table(database, "orders", ORDERS, [])
+    (database / "users_rows.json.tmp").write_text("[")
+
+    catalog = storage.load_catalog()
+
+    assert sorted(catalog["tables"]) == ["orders", "users"]
+    entry = catalog["tables"]["users"]
+    assert entry["schema"]["columns"] == USERS
+    assert entry["stats"]["row_count"] == 2
+    assert entry["stats"]["modified_at"] == os.path.getmtime(database / "users_rows.json")
+    assert entry["indexes"]["pk"]["column"] == "id"
+
+    # The migration is saved, and the interrupted write cleaned up
+    assert json.loads((database / "catalog.json").read_text()) == catalog
+    assert not (database / "users_rows.json.tmp").exists()
+
+    assert select("users", where=("id", "=", 1)) == [rows[1]]
+
+
+def test_catalog_file_replaces_schema_files(database):
+    write_legacy_table(database, "users", USERS, [])
+    storage.load_catalog()
+
+    (database / "users_schema.json").unlink()
+    reopen()
+    assert storage.table_exists("users")
+
+
+def test_empty_directory_writes_no_catalog(database):
+    assert storage.load_catalog()["tables"] == {}
+    assert not (database / "catalog.json").exists()
+
+
+def test_show_tables(database):
+    create_table("users", USERS)
+    create_table("orders", ORDERS)
+    insert_into("users", [1, "ann", "a@x"])
+    insert_into("orders", [10, 1])
+    insert_into("orders", [11, 1])
+    create_materialized_view("user_orders", "users", "orders", "id", "user_id")
+
+    expected = [
+        {"table": "orders", "type": "table", "primary_key": "id", "rows": 2},
+        {"table": "user_orders", "type": "view", "primary_key": None, "rows": 2},
+        {"table": "users", "type": "table", "primary_key": "id", "rows": 1},
+    ]
+    assert execute(parse("SHOW TABLES;")) == expected
+
+    # Answered from the catalog without loading any table
+    reopen()
+    assert show_tables() == expected
+    assert mvcc._current == {}
+
+
+def test_describe(database):
+    create_table("users", USERS)
+
+    assert execute(parse("DESCRIBE users;")) == [
+        {"column": "id", "type": "INT", "primary_key": True, "unique": False, "distinct": None},
+        {"column": "name", "type": "TEXT", "primary_key": False, "unique": False, "distinct": None},
+        {"column": "email", "type": "TEXT", "primary_key": False, "unique": True, "distinct": None},
+    ]
+    with pytest.raises(Exception, match="does not exist"):
+        describe_table("missing")
+
+
+def test_create_existing_table_fails(database):
+    create_table("users", USERS)
+    insert_into("users", [1, "ann", "a@x"])
+
+    with pytest.raises(Exception, match="Table 'users' already exists"):
+        create_table("users", ORDERS)
+    with pytest.raises(Exception, match="already exists"):
+        execute(parse("CREATE TABLE users (id INT PRIMARY KEY, name TEXT);"))
+
+    # The first table is left as it was
+    assert describe_table("users")[2]["column"] == "email"
+    assert len(select("users")) == 1
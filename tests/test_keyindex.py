@@ -0,0 +1,164 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import struct
+
+import pytest
+
+from rdbms import keyindex, storage
+from rdbms.keyindex import SortedIndex, write_index, open_index, INT_KEYS, TEXT_KEYS
+
+
+def round_trip(tmp_path, index, key_type=None):
+    path = str(tmp_path / "t_pk_index.bin")
+    write_index(path, index, key_type)
+    return open_index(path)
+
+
+def test_int_keys_round_trip(tmp_path):
+    index = {5: 0, -3: 1, 2 ** 40: 2, 0: 3}
+    loaded = round_trip(tmp_path, index)
+
+    assert isinstance(loaded, SortedIndex)
+    assert loaded.key_type == INT_KEYS
+    assert dict(loaded.items()) == index
+    assert list(loaded) == sorted(index)
+    assert loaded.positions() == [index[key] for key in sorted(index)]
+    assert loaded[5] == 0 and loaded.get(2 ** 40) == 2
+    assert loaded.get(4) is None and 4 not in loaded
+    assert loaded.get("5") is None
+
+
+def test_text_keys_round_trip_with_non_ascii(tmp_path):
+    index = {"b": 0, "é": 1, "a": 2, "zz": 3, "ä": 4, "日本": 5, "": 6}
+    loaded = round_trip(tmp_path, index)
+
+    assert loaded.key_type == TEXT_KEYS
+    assert dict(loaded.items()) == index
+    assert list(loaded) == sorted(index)
+    assert loaded["日本"] == 5 and loaded[""] == 6
+    assert "é" in loaded and "e" not in loaded
+    assert loaded.get(1) is None
+
+
+def test_text_layout(tmp_path):
+    path = str(tmp_path / "t_pk_index.bin")
+    write_index(path, {"ab": 7, "é": 3})
+    with open(path, "rb") as f:
+        data = f.read()
+
+    magic, key_type, count = keyindex.HEADER.unpack_from(data)
+    assert (magic, key_type, count) == (b"PKIX", TEXT_KEYS, 2)
+
+    start = keyindex.HEADER.size
+    offsets = struct.unpack_from("<3q", data, start)
+    positions = struct.unpack_from("<2q", data, start + 3 * 8)
+    blob = data[start + 5 * 8:]
+    assert offsets == (0, 2, 4)
+    assert positions == (7, 3)
+    assert blob == "abé".encode("utf-8")
+
+
+@pytest.mark.parametrize("key_type", [INT_KEYS, TEXT_KEYS])
+def test_empty_index_keeps_key_type(tmp_path, key_type):
+    loaded = round_trip(tmp_path, {}, key_type)
+
+    assert loaded.key_type == key_type
+    assert len(loaded) == 0 and list(loaded) == [] and loaded.positions() == []
+    assert loaded.get(1) is None and loaded.get("a") is None
+
+
+def test_mismatched_key_type_is_rejected(tmp_path):
+    with pytest.raises(Exception):
+        round_trip(tmp_path, {"1": 0}, INT_KEYS)
+    with pytest.raises(Exception):
+        round_trip(tmp_path, {1: 0, "a": 1})
+
+
+def test_rewriting_a_loaded_index(tmp_path):
+    loaded = round_trip(tmp_path, {"x": 1, "y": 0})
+    again = round_trip(tmp_path, loaded)
+
+    assert again.key_type == TEXT_KEYS
+    assert dict(again.items()) == {"x": 1, "y": 0}
+
+
+def test_byteswap_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "t_pk_index.bin")
+    write_index(path, {1: 0, 2: 1})
+    with open(path, "rb") as f:
+        little_endian = f.read()
+
+    # Pretend to be a big-endian machine: arrays are swapped on the way
+    # out and back in, so the index still round-trips
+    monkeypatch.setattr(keyindex, "NATIVE", not keyindex.NATIVE)
+    for index in ({1: 0, 2: 1, 300: 2}, {"a": 1, "ü": 0}):
+        assert dict(round_trip(tmp_path, index).items()) == index
+
+    write_index(path, {1: 0, 2: 1})
+    with open(path, "rb") as f:
+        swapped = f.read()
+    assert swapped != little_endian
+
+
+def test_bad_file_is_rejected(tmp_path):
+    path = tmp_path / "t_pk_index.bin"
+    path.write_bytes(b"JUNK" + bytes(12))
+    with pytest.raises(Exception):
+        open_index(str(path))
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """An empty storage directory with a fresh catalog"""
+    monkeypatch.setattr(storage, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(storage, "_catalog", None)
+    monkeypatch.setattr(storage, "_catalog_dirty", False)
+    return tmp_path
+
+
+def write_legacy_table(data_dir, table_name, pk_type, index):
+    schema = {
+        "table": table_name,
+        "columns": {
+            "id": {"type": pk_type, "primary_key": True},
+            "name": {"type": "TEXT"}
+        },
+        "primary_key": "id"
+    }
+    (data_dir / f"{table_name}_schema.json").write_text(json.dumps(schema))
+    (data_dir / f"{table_name}_rows.json").write_text("[]")
+    (data_dir / f"{table_name}_pk_index.json").write_text(json.dumps(index))
+
+
+def test_load_legacy_json_index(data_dir):
+    write_legacy_table(data_dir, "users", "INT", {"1": 0, "5": 1, "10": 2})
+    write_legacy_table(data_dir, "codes", "TEXT", {"1": 0, "a": 1})
+
+    assert storage.load_index("users") == {1: 0, 5: 1, 10: 2}
+    assert storage.load_index("codes") == {"1": 0, "a": 1}
+
+
+def test_legacy_index_migrates_on_save(data_dir):
+    write_legacy_table(data_dir, "users", "INT", {"1": 0, "5": 1})
+
+    storage.save_index("users", storage.load_index("users"))
+
+    assert not (data_dir / "users_pk_index.json").exists()
+    assert (data_dir / "users_pk_index.bin").exists()
+    loaded = storage.load_index("users")
+    assert isinstance(loaded, SortedIndex)
+    assert dict(loaded.items()) == {1: 0, 5: 1}
+    assert storage.table_entry("users")["indexes"]["pk"]["file"] == "users_pk_index.bin"
+
+
+def test_empty_text_table_index(data_dir):
+    write_legacy_table(data_dir, "codes", "TEXT", {})
+
+    storage.save_index("codes", storage.load_index("codes"))
+
+    loaded = storage.load_index("codes")
+    assert loaded.key_type == TEXT_KEYS
+    assert len(loaded) == 0
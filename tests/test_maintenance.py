@@ -0,0 +1,157 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import time
+
+import pytest
+
+from rdbms import maintenance, mvcc, storage
+from rdbms.engine import create_table, create_index, insert_into, update, describe_table
+from rdbms.parser import parse
+from rdbms.repl import execute
+
+
+@pytest.fixture
+def manual(database, monkeypatch):
+    """No maintenance thread - tests decide when to flush"""
+    maintenance.stop()
+    monkeypatch.setattr(maintenance, "start", lambda: None)
+    monkeypatch.setattr(maintenance, "_dirty_bytes", 0)
+    return database
+
+
+def create_users():
+    create_table("users", {
+        "id": {"type": "INT", "primary_key": True},
+        "name": {"type": "TEXT"},
+        "email": {"type": "TEXT"}
+    })
+
+
+def add_users(count, start=0):
+    for i in range(start, start + count):
+        insert_into("users", [i, f"user{i % 3}", f"u{i}@example.com"])
+
+
+def rows_on_disk(table_name):
+    with open(storage.row_path(table_name)) as f:
+        return f.read()
+
+
+def test_configure(monkeypatch):
+    # monkeypatch restores the settings afterwards
+    for name in ("FLUSH_INTERVAL", "DIRTY_BYTES_LIMIT", "STATS_INTERVAL", "COMPACT_ROWS"):
+        monkeypatch.setattr(maintenance, name, getattr(maintenance, name))
+
+    maintenance.configure(flush_interval=5, dirty_bytes=10)
+    assert (maintenance.FLUSH_INTERVAL, maintenance.DIRTY_BYTES_LIMIT) == (5, 10)
+
+    maintenance.configure(stats_interval=7, compact_rows=3)
+    assert (maintenance.STATS_INTERVAL, maintenance.COMPACT_ROWS) == (7, 3)
+    assert (maintenance.FLUSH_INTERVAL, maintenance.DIRTY_BYTES_LIMIT) == (5, 10)
+
+
+def test_writes_stay_in_memory_until_checkpoint(manual):
+    create_users()
+    add_users(3)
+
+    assert "users" in maintenance._dirty
+    assert not os.path.exists(storage.row_path("users"))
+
+    assert execute(parse("CHECKPOINT;")) == "Checkpoint complete: 1 table(s) flushed."
+    assert not maintenance._dirty
+    assert [row["id"] for row in json.loads(rows_on_disk("users"))] == [0, 1, 2]
+
+    # Everything needed to reload the table made it to disk
+    mvcc._current.pop("users")
+    assert len(mvcc.latest("users").rows) == 3
+    assert execute(parse("CHECKPOINT")) == "Checkpoint complete: 0 table(s) flushed."
+
+
+def test_dirty_bytes_trigger_an_early_flush(database, monkeypatch):
+    maintenance.stop()
+    monkeypatch.setattr(maintenance, "_dirty_bytes", 0)
+    monkeypatch.setattr(maintenance, "FLUSH_INTERVAL", 3600)
+    monkeypatch.setattr(maintenance, "DIRTY_BYTES_LIMIT", 3 * maintenance.ROW_BYTES_ESTIMATE)
+    create_users()
+
+    try:
+        add_users(2)
+        assert "users" in maintenance._dirty
+
+        add_users(1, start=2)
+        deadline = time.monotonic() + 5
+        while "users" in maintenance._dirty and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert "users" not in maintenance._dirty
+        assert len(json.loads(rows_on_disk("users"))) == 3
+    finally:
+        maintenance.stop()
+
+
+def test_compaction(manual, monkeypatch):
+    monkeypatch.setattr(maintenance, "COMPACT_ROWS", 4)
+    create_users()
+    create_index("users", "users_name_trgm", "name")
+    add_users(3)
+    maintenance.checkpoint()
+
+    assert storage.table_format("users") != storage.COMPACT_FORMAT
+    assert "\n" in rows_on_disk("users")
+
+    add_users(1, start=3)
+    maintenance.checkpoint()
+
+    assert storage.table_format("users") == storage.COMPACT_FORMAT
+    assert "\n" not in rows_on_disk("users")
+    with open(storage.secondary_index_path("users", "users_name_trgm")) as f:
+        assert "\n" not in f.read()
+
+    mvcc._current.pop("users")
+    assert len(mvcc.latest("users").rows) == 4
+
+
+def test_statistics(manual):
+    create_users()
+    add_users(5)
+    assert all(column["distinct"] is None for column in describe_table("users"))
+
+    assert maintenance.refresh_statistics() == 1
+    distinct = {column["column"]: column["distinct"] for column in describe_table("users")}
+    assert distinct == {"id": 5, "name": 3, "email": 5}
+
+    # Only tables written since the last refresh are recounted
+    assert maintenance.refresh_statistics() == 0
+
+
+def test_unchanged_trigram_index_is_not_rewritten(manual, monkeypatch):
+    create_users()
+    create_index("users", "users_name_trgm", "name")
+    create_index("users", "users_email_trgm", "email")
+    add_users(3)
+    maintenance.checkpoint()
+
+    written = []
+    save = maintenance.save_secondary_index
+
+    def save_secondary_index(table_name, index_name, postings):
+        written.append(index_name)
+        save(table_name, index_name, postings)
+
+    monkeypatch.setattr(maintenance, "save_secondary_index", save_secondary_index)
+
+    update("users", "name", "renamed", "id", 1)
+    maintenance.checkpoint()
+    assert written == ["users_name_trgm"]
+
+
+def test_exit_hook_is_registered_once(database, monkeypatch):
+    registered = []
+    monkeypatch.setattr(maintenance.atexit, "register", registered.append)
+
+    for _ in range(2):
+        maintenance.start()
+        maintenance.stop()
+    assert registered == []
@@ -0,0 +1,90 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+
+from rdbms import mvcc
+from rdbms.engine import create_table, insert_into, update, delete_from, select, changes_since
+from rdbms.mvcc import snapshot, latest, retained_versions, changed_keys
+
+
+def create_users():
+    create_table("users", {
+        "id": {"type": "INT", "primary_key": True},
+        "name": {"type": "TEXT"}
+    })
+
+
+def test_snapshot_is_stable_while_writes_commit(database):
+    create_users()
+    insert_into("users", [1, "Ann"])
+
+    with snapshot("users") as (version,):
+        insert_into("users", [2, "Bob"])
+        update("users", "name", "Anna", "id", 1)
+
+        assert version.rows == [{"id": 1, "name": "Ann"}]
+        assert dict(version.index.items()) == {1: 0}
+
+    assert select("users", ordered_by_pk=True) == [
+        {"id": 1, "name": "Anna"},
+        {"id": 2, "name": "Bob"}
+    ]
+
+
+def test_superseded_versions_are_released(database):
+    create_users()
+    insert_into("users", [1, "Ann"])
+
+    with snapshot("users") as (version,):
+        insert_into("users", [2, "Bob"])
+        assert retained_versions() == [("users", version.version)]
+    assert retained_versions() == []
+
+
+def test_readers_see_whole_writes(database):
+    create_users()
+    for i in range(50):
+        insert_into("users", [i, "x"])
+
+    errors = []
+    done = threading.Event()
+
+    def writer():
+        for i in range(200):
+            update("users", "name", f"v{i}", "name", "x" if i == 0 else f"v{i - 1}")
+        done.set()
+
+    def reader():
+        while not done.is_set():
+            names = {row["name"] for row in select("users")}
+            if len(names) != 1:
+                errors.append(names)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+
+
+def test_change_log(database):
+    create_users()
+    start = latest("users").version
+    insert_into("users", [1, "Ann"])
+    insert_into("users", [2, "Bob"])
+    delete_from("users", "id", 1)
+
+    assert changed_keys("users", start, latest("users").version) == {1, 2}
+
+    changes = changes_since("users", start + 1)
+    assert changes["full"] is False
+    assert changes["rows"] == [{"id": 2, "name": "Bob"}]
+    assert changes["deleted"] == [1]
+
+    # Beyond the change log's reach the whole table is returned
+    mvcc._changelogs["users"].start = latest("users").version
+    assert changes_since("users", start)["full"] is True
@@ -0,0 +1,146 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import functools
+import random
+
+import pytest
+
+from rdbms import maintenance, mvcc
+from rdbms.engine import create_table, insert_into, select, select_join, order_rows
+from rdbms.keyindex import SortedIndex
+from rdbms.parser import parse, parse_order_by
+
+
+def test_parse_order_by_columns_and_directions():
+    tokens = "SELECT * FROM orders ORDER BY total desc, name, id ASC LIMIT 5".split()
+    rest, order_by, limit = parse_order_by(tokens)
+
+    assert rest == ["SELECT", "*", "FROM", "orders"]
+    assert order_by == [["total", "DESC"], ["name", "ASC"], ["id", "ASC"]]
+    assert limit == 5
+
+
+def test_parse_select_with_order_by_and_limit():
+    assert parse("SELECT * FROM orders LIMIT 3;") == {
+        "type": "select", "table": "orders", "where": None, "order_by": None, "limit": 3
+    }
+    command = parse("SELECT * FROM users JOIN orders ON users.id = orders.user_id ORDER BY orders.total DESC LIMIT 2")
+    assert command["type"] == "select_join"
+    assert command["order_by"] == [["orders.total", "DESC"]]
+    assert command["limit"] == 2
+
+
+@pytest.mark.parametrize("query, message", [
+    ("SELECT * FROM t LIMIT x", "LIMIT must be an integer"),
+    ("SELECT * FROM t LIMIT -1", "LIMIT must not be negative"),
+    ("SELECT * FROM t LIMIT 1 2", "Invalid LIMIT syntax"),
+    ("SELECT * FROM t LIMIT", "Invalid LIMIT syntax"),
+    ("SELECT * FROM t ORDER id", "Invalid ORDER BY syntax"),
+    ("SELECT * FROM t ORDER BY id UP", "Invalid ORDER BY syntax"),
+])
+def test_parse_order_by_errors(query, message):
+    with pytest.raises(Exception, match=message):
+        parse(query)
+
+
+def reference_order(rows, order_by):
+    """Straightforward comparison sort used to check order_rows"""
+    def compare(a, b):
+        for column, direction in order_by:
+            if a[column] != b[column]:
+                result = -1 if a[column] < b[column] else 1
+                return -result if direction == "DESC" else result
+        return 0
+    return sorted(rows, key=functools.cmp_to_key(compare))
+
+
+def test_order_rows_matches_reference():
+    rng = random.Random(0)
+    rows = [
+        {"id": i, "total": rng.randrange(20), "name": rng.choice("abcd"), "qty": rng.randrange(3)}
+        for i in range(500)
+    ]
+
+    for _ in range(300):
+        columns = rng.sample(["total", "name", "qty", "id"], rng.randint(1, 3))
+        order_by = [(column, rng.choice(["ASC", "DESC"])) for column in columns]
+        limit = rng.choice([None, 0, 1, 10, 100, 1000])
+
+        expected = reference_order(rows, order_by)
+        if limit is not None:
+            expected = expected[:limit]
+        result = order_rows(iter(rows), order_by, limit)
+
+        # Rows tied on every ORDER BY column may come in any order
+        values = lambda result_rows: [[row[c] for c, _ in order_by] for row in result_rows]
+        assert values(result) == values(expected), (order_by, limit)
+
+
+def create_tables():
+    create_table("users", {
+        "id": {"type": "INT", "primary_key": True},
+        "name": {"type": "TEXT"}
+    })
+    create_table("orders", {
+        "id": {"type": "INT", "primary_key": True},
+        "user_id": {"type": "INT"},
+        "total": {"type": "INT"}
+    })
+    for user_id, name in ((1, "b"), (2, "a"), (3, "c")):
+        insert_into("users", [user_id, name])
+    for order_id, user_id, total in ((10, 1, 5), (11, 2, 7), (12, 1, 9), (13, 3, 5)):
+        insert_into("orders", [order_id, user_id, total])
+
+
+def test_join_order_by_resolves_columns(database):
+    create_tables()
+
+    rows = select_join("users", "orders", "id", "user_id", order_by=[("total", "DESC"), ("name", "ASC")])
+    assert [(row["orders.total"], row["users.name"]) for row in rows] == [(9, "b"), (7, "a"), (5, "b"), (5, "c")]
+
+    rows = select_join("users", "orders", "id", "user_id", order_by=[("orders.id", "DESC")], limit=2)
+    assert [row["orders.id"] for row in rows] == [13, 12]
+
+
+def test_join_order_by_ambiguous_or_unknown_column(database):
+    create_tables()
+
+    with pytest.raises(Exception, match="ambiguous"):
+        select_join("users", "orders", "id", "user_id", order_by=[("id", "ASC")])
+    with pytest.raises(Exception, match="Unknown or ambiguous"):
+        select_join("users", "orders", "id", "user_id", order_by=[("nope", "ASC")])
+
+
+def reload(table_name):
+    """Drop the cached version so the table is read back from disk"""
+    maintenance.checkpoint()
+    mvcc._current.pop(table_name)
+    return mvcc.latest(table_name)
+
+
+@pytest.mark.parametrize("memory_mapped", [True, False])
+def test_primary_key_order(database, memory_mapped):
+    create_table("items", {
+        "id": {"type": "INT", "primary_key": True},
+        "name": {"type": "TEXT"}
+    })
+    keys = random.Random(1).sample(range(1000), 50)
+    for key in keys:
+        insert_into("items", [key, f"n{key}"])
+
+    version = reload("items")
+    assert isinstance(version.index, SortedIndex)
+    if not memory_mapped:
+        # A write replaces the mapped index with a dict
+        insert_into("items", [-1, "first"])
+        keys.append(-1)
+        assert isinstance(mvcc.latest("items").index, dict)
+
+    ids = lambda rows: [row["id"] for row in rows]
+    assert ids(select("items", order_by=[("id", "ASC")], limit=5)) == sorted(keys)[:5]
+    assert ids(select("items", order_by=[("id", "DESC")], limit=5)) == sorted(keys, reverse=True)[:5]
+    assert ids(select("items", order_by=[("id", "DESC"), ("name", "ASC")])) == sorted(keys, reverse=True)
+    assert ids(select("items", ordered_by_pk=True, limit=3)) == sorted(keys)[:3]
+    assert ids(select("items", ordered_by_pk=True)) == sorted(keys)
@@ -0,0 +1,123 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+
+import pytest
+
+from rdbms import mvcc, protocol
+from rdbms.client import Client
+from rdbms.protocol import HEADER, MAX_FRAME_SIZE, encode_frame, read_frame
+from rdbms.server import DatabaseServer
+
+
+def read_frames(data):
+    async def read_all():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        frames = []
+        while True:
+            try:
+                frames.append(await read_frame(reader))
+            except asyncio.IncompleteReadError:
+                return frames
+    return asyncio.run(read_all())
+
+
+def test_frames_round_trip():
+    messages = [{"id": 1, "sql": "SELECT * FROM users;"}, {"id": 2, "rows": [{"name": "é"}]}]
+    data = b"".join(encode_frame(message) for message in messages)
+    assert read_frames(data) == messages
+
+
+def test_truncated_frame_is_incomplete():
+    assert read_frames(encode_frame({"id": 1})[:-1]) == []
+
+
+def test_oversized_frame_is_rejected():
+    with pytest.raises(Exception):
+        read_frames(HEADER.pack(MAX_FRAME_SIZE + 1))
+
+
+def run_with_server(database, test, batch_size=3):
+    async def main():
+        server = DatabaseServer(port=0, batch_size=batch_size)
+        await server.start()
+        port = server.server.sockets[0].getsockname()[1]
+        try:
+            async with await Client.connect(port=port) as client:
+                await test(client)
+        finally:
+            await server.close()
+    asyncio.run(main())
+
+
+def test_pipelined_statements(database):
+    async def test(client):
+        await client.execute("CREATE TABLE users (id INT PRIMARY KEY, name TEXT)")
+        results = await client.execute_many(
+            [f"INSERT INTO users VALUES ({i}, 'u{i}')" for i in range(10)] + ["SELECT * FROM users"]
+        )
+        assert results[:10] == ["1 row inserted."] * 10
+        assert [row["id"] for row in results[10]] == list(range(10))
+
+        with pytest.raises(Exception, match="does not exist"):
+            await client.execute("SELECT * FROM missing")
+
+    run_with_server(database, test)
+
+
+def test_results_stream_from_a_pinned_snapshot(database):
+    async def test(client):
+        await client.execute("CREATE TABLE users (id INT PRIMARY KEY, name TEXT)")
+        await client.execute_many([f"INSERT INTO users VALUES ({i}, 'u{i}')" for i in range(10)])
+
+        rows = []
+        async for row in client.stream("SELECT * FROM users"):
+            rows.append(row)
+        assert [row["id"] for row in rows] == list(range(10))
+
+        limited = await client.execute("SELECT * FROM users ORDER BY name DESC LIMIT 2")
+        assert [row["name"] for row in limited] == ["u9", "u8"]
+
+        # Finished queries no longer pin the table
+        assert mvcc.latest("users").readers == 0
+
+    run_with_server(database, test)
+
+
+def test_oversized_reply_becomes_an_error(database, monkeypatch):
+    async def test(client):
+        await client.execute("CREATE TABLE users (id INT PRIMARY KEY, name TEXT)")
+        await client.execute_many([f"INSERT INTO users VALUES ({i}, '{'x' * 100}')" for i in range(10)])
+
+        monkeypatch.setattr(protocol, "MAX_FRAME_SIZE", 300)
+        with pytest.raises(Exception, match="exceeds the protocol limit"):
+            await asyncio.wait_for(client.execute("SELECT * FROM users"), 5)
+
+        # The connection keeps answering later requests
+        rows = await asyncio.wait_for(client.execute("SELECT * FROM users LIMIT 2"), 5)
+        assert [row["id"] for row in rows] == [0, 1]
+        assert mvcc.latest("users").readers == 0
+
+    run_with_server(database, test, batch_size=3)
+
+
+def test_failed_request_is_still_answered(database, monkeypatch):
+    run_request = DatabaseServer.run_request
+
+    async def failing_run_request(self, message, writer):
+        if message["sql"] == "FAIL":
+            raise RuntimeError("request handler failed")
+        await run_request(self, message, writer)
+
+    monkeypatch.setattr(DatabaseServer, "run_request", failing_run_request)
+
+    async def test(client):
+        with pytest.raises(Exception, match="request handler failed"):
+            await asyncio.wait_for(client.execute("FAIL"), 5)
+        assert await asyncio.wait_for(client.execute("SHOW TABLES"), 5) is not None
+
+    run_with_server(database, test)
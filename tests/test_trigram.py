@@ -0,0 +1,106 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+
+import pytest
+
+from rdbms import trigram
+from rdbms.parser import parse
+from rdbms.trigram import (
+    like_matcher, pattern_trigrams, trigrams, escape_like,
+    build_postings, update_postings, candidates
+)
+
+VALUES = ["ann_lee@x.com", "annXlee@x.com", "50% off", "50 off", "a\\b", "", "abc", "_x", "%"]
+
+
+@pytest.mark.parametrize("pattern, expected", [
+    ("%ann_lee%", ["ann_lee@x.com", "annXlee@x.com"]),
+    ("%ann\\_lee%", ["ann_lee@x.com"]),
+    ("%50\\%%", ["50% off"]),
+    ("a\\\\b", ["a\\b"]),
+    ("\\_x", ["_x"]),
+    ("\\%", ["%"]),
+    ("a%", ["ann_lee@x.com", "annXlee@x.com", "a\\b", "abc"]),
+    ("%off", ["50% off", "50 off"]),
+    ("", [""]),
+    ("%", VALUES),
+])
+def test_like_matcher(pattern, expected):
+    matches = like_matcher(pattern)
+    assert [value for value in VALUES if matches(value)] == expected
+
+
+def test_matching_values_contain_pattern_trigrams():
+    # The index may only narrow candidates, never drop a real match
+    rng = random.Random(0)
+    for _ in range(20000):
+        pattern = "".join(rng.choice("ab_%\\") for _ in range(rng.randrange(7)))
+        value = "".join(rng.choice("ab_%\\") for _ in range(rng.randrange(7)))
+        if like_matcher(pattern)(value):
+            assert pattern_trigrams(pattern) <= trigrams(value), (pattern, value)
+
+
+def test_escape_like_matches_literally():
+    for value in VALUES:
+        assert like_matcher(f"%{escape_like(value)}%")(value)
+    assert not like_matcher(f"%{escape_like('ann_lee')}%")("annXlee@x.com")
+
+
+@pytest.mark.parametrize("threshold", [5, 4096])
+def test_update_postings_matches_rebuild(monkeypatch, threshold):
+    monkeypatch.setattr(trigram, "MERGE_THRESHOLD", threshold)
+    rng = random.Random(threshold)
+    rows = {}
+    postings = build_postings([], "v", "id")
+    history = []
+
+    for _ in range(1500):
+        key = rng.randrange(30)
+        old = rows.get(key)
+        if rng.random() < 0.6:
+            new = {"id": key, "v": "".join(rng.choice("abc") for _ in range(rng.randrange(6)))}
+            postings = update_postings(postings, "v", "id", [old] if old else [], [new])
+            rows[key] = new
+        elif old:
+            postings = update_postings(postings, "v", "id", [old], [])
+            del rows[key]
+
+        expected = dict(build_postings(rows.values(), "v", "id").items())
+        assert dict(postings.items()) == expected
+        history.append((postings, expected))
+
+    # Earlier versions never see later writes
+    for old_postings, expected in history[::50]:
+        assert dict(old_postings.items()) == expected
+
+
+def test_candidates_cover_matches():
+    rows = [{"id": i, "v": value} for i, value in enumerate(VALUES)]
+    postings = build_postings(rows, "v", "id")
+    postings = update_postings(postings, "v", "id", [rows[1]], [{"id": 1, "v": "ann_lee@y.org"}])
+    rows[1] = {"id": 1, "v": "ann_lee@y.org"}
+
+    for pattern in ("%ann\\_lee%", "%lee@%", "50%", "%.com"):
+        keys = candidates(postings, pattern)
+        matching = {row["id"] for row in rows if like_matcher(pattern)(row["v"])}
+        assert keys is not None and matching <= keys
+
+    assert candidates(postings, "%a%") is None
+
+
+@pytest.mark.parametrize("query, pattern, order_by, limit", [
+    ("SELECT * FROM t WHERE v LIKE '%a  b%'", "%a  b%", None, None),
+    ("SELECT * FROM t WHERE v LIKE '% order %' ORDER BY id DESC", "% order %", [["id", "DESC"]], None),
+    ("SELECT * FROM t WHERE v LIKE '%top limit 5'", "%top limit 5", None, None),
+    ("SELECT * FROM t WHERE v like 'a;b' LIMIT 2;", "a;b", None, 2),
+    ("SELECT * FROM t WHERE v LIKE \"it's%\"", "it's%", None, None),
+    ("SELECT * FROM t WHERE v LIKE ''", "", None, None),
+])
+def test_like_pattern_is_parsed_as_written(query, pattern, order_by, limit):
+    command = parse(query)
+    assert command["where"] == ["v", "LIKE", pattern]
+    assert command["order_by"] == order_by
+    assert command["limit"] == limit
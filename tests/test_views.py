@@ -0,0 +1,88 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import threading
+
+import pytest
+
+from rdbms.engine import (
+    create_table, create_materialized_view, insert_into, update, delete_from,
+    select, inner_join
+)
+
+
+def create_tables():
+    create_table("users", {
+        "id": {"type": "INT", "primary_key": True},
+        "name": {"type": "TEXT"}
+    })
+    create_table("orders", {
+        "id": {"type": "INT", "primary_key": True},
+        "user_id": {"type": "INT"}
+    })
+    create_materialized_view("uo", "orders", "users", "user_id", "id")
+
+
+def assert_view_matches_join():
+    key = lambda row: sorted(row.items())
+    view = sorted(map(key, select("uo")))
+    join = sorted(map(key, inner_join("orders", "users", "user_id", "id")))
+    assert view == join
+
+
+def test_view_follows_random_writes(database):
+    create_tables()
+    rng = random.Random(0)
+
+    for _ in range(300):
+        i = rng.randrange(20)
+        try:
+            choice = rng.random()
+            if choice < 0.3:
+                insert_into("users", [i, f"u{rng.randrange(5)}"])
+            elif choice < 0.6:
+                insert_into("orders", [i, rng.randrange(20)])
+            elif choice < 0.7:
+                update("users", "id", rng.randrange(20), "id", i)
+            elif choice < 0.8:
+                update("orders", "user_id", rng.randrange(20), "id", i)
+            elif choice < 0.9:
+                delete_from("users", "id", i)
+            else:
+                delete_from("orders", "id", i)
+        except Exception as e:
+            assert "constraint" in str(e)
+
+    assert_view_matches_join()
+
+
+def test_concurrent_writes_to_both_base_tables(database):
+    create_tables()
+
+    def add_users():
+        for i in range(300):
+            insert_into("users", [i, "u"])
+
+    def add_orders():
+        for i in range(300):
+            insert_into("orders", [i, i])
+
+    threads = [threading.Thread(target=add_users), threading.Thread(target=add_orders)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(select("uo")) == 300
+    assert_view_matches_join()
+
+
+def test_views_cannot_be_modified_or_used_as_bases(database):
+    create_tables()
+
+    with pytest.raises(Exception, match="Cannot modify"):
+        insert_into("uo", [1, 1, 1, "u"])
+    with pytest.raises(Exception, match="on view"):
+        create_materialized_view("uou", "uo", "users", "orders.user_id", "id")
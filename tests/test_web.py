@@ -0,0 +1,118 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import importlib
+import types
+
+import pytest
+
+pytest.importorskip("flask")
+
+from rdbms import mvcc, storage
+from rdbms.engine import create_table, insert_into, update, delete_from, table_version
+
+
+class Clock:
+    """Stands in for time.time() in the storage layer and the web app"""
+
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def app(database, monkeypatch):
+    clock = Clock(100.2)
+    monkeypatch.setattr(storage, "time", types.SimpleNamespace(time=clock.time))
+
+    create_table("users", {
+        "id": {"type": "INT", "primary_key": True},
+        "name": {"type": "TEXT"},
+        "email": {"type": "TEXT"}
+    })
+    web_app = importlib.import_module("web.app")
+    web_app.ensure_search_indexes()
+    monkeypatch.setattr(web_app, "time", types.SimpleNamespace(time=clock.time))
+
+    web_app.app.config["TESTING"] = True
+    web_app.app.clock = clock
+    return web_app.app
+
+
+def add_user(user_id, name):
+    insert_into("users", {"id": user_id, "name": name, "email": f"{name}@example.com"})
+
+
+def test_etag_revalidation(app):
+    client = app.test_client()
+    add_user(1, "ann")
+
+    response = client.get("/")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    assert client.get("/", headers={"If-None-Match": etag}).status_code == 304
+
+    add_user(2, "bob")
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_if_modified_since(app):
+    client = app.test_client()
+    add_user(1, "ann")
+
+    # Still within the second of the write: a later write in that second
+    # must not be hidden behind the whole-second Last-Modified
+    app.clock.now = 100.5
+    since = client.get("/").headers["Last-Modified"]
+    app.clock.now = 100.7
+    add_user(2, "bob")
+    assert client.get("/", headers={"If-Modified-Since": since}).status_code == 200
+
+    # Once the second is over, the copy is current until the next write
+    app.clock.now = 102.0
+    since = client.get("/").headers["Last-Modified"]
+    assert client.get("/", headers={"If-Modified-Since": since}).status_code == 304
+
+    app.clock.now = 102.5
+    add_user(3, "cy")
+    assert client.get("/", headers={"If-Modified-Since": since}).status_code == 200
+
+
+def test_changes_requires_since(app):
+    response = app.test_client().get("/api/users/changes")
+    assert response.status_code == 400
+    assert "since" in response.get_json()["error"]
+
+
+def test_changes_are_incremental(app):
+    for user_id, name in ((1, "ann"), (2, "bob"), (3, "cy")):
+        add_user(user_id, name)
+    since = table_version("users")
+
+    update("users", "name", "anna", "id", 1)
+    delete_from("users", "id", 2)
+    add_user(4, "dee")
+
+    changes = app.test_client().get(f"/api/users/changes?since={since}").get_json()
+    assert changes["full"] is False
+    assert changes["version"] == table_version("users")
+    assert [(user["id"], user["name"]) for user in changes["rows"]] == [(1, "anna"), (4, "dee")]
+    assert changes["deleted"] == [2]
+
+
+def test_changes_fall_back_to_the_full_table(app, monkeypatch):
+    monkeypatch.setattr(mvcc, "CHANGELOG_SIZE", 2)
+    since = table_version("users")
+    for user_id, name in ((3, "cy"), (1, "ann"), (2, "bob")):
+        add_user(user_id, name)
+
+    changes = app.test_client().get(f"/api/users/changes?since={since}").get_json()
+    assert changes["full"] is True
+    assert [user["id"] for user in changes["rows"]] == [1, 2, 3]
+    assert changes["deleted"] == []
@@ -3,20 +3,87 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from flask import Flask, render_template, request, redirect, url_for
-from rdbms.engine import insert_into, select, update, delete_from
+import math
+import time
+from datetime import datetime, timezone
+
+from flask import Flask, render_template, request, redirect, url_for, jsonify, make_response
+from rdbms.engine import (
+    insert_into, select, update, delete_from, create_index,
+    table_version, last_modified, changes_since
+)
+from rdbms.trigram import escape_like
 
 app = Flask(__name__)
 
+# Columns searched by the type-ahead box, each backed by a trigram index
+SEARCH_COLUMNS = ("name", "email")
+SEARCH_LIMIT = 20
+
+
+def ensure_search_indexes():
+    """Create the trigram indexes used by type-ahead search"""
+    for column in SEARCH_COLUMNS:
+        try:
+            create_index("users", f"users_{column}_trgm", column, if_not_exists=True)
+        except Exception as e:
+            print(f"Search index error: {e}")
+
+def users_validators():
+    """
+    ETag, exact modification time and Last-Modified for the users table
+    Last-Modified only has whole seconds: it is the end of the second of the
+    last write once that second is over, and the start of it before then,
+    so a later write in the same second is never hidden behind it
+    """
+    etag = f"users-{table_version('users')}"
+    modified_at = last_modified("users")
+    seconds = min(math.ceil(modified_at), math.floor(time.time()))
+    return etag, modified_at, datetime.fromtimestamp(seconds, tz=timezone.utc)
+
+
+def is_not_modified(etag, modified_at):
+    """Check whether the client's cached copy is still current"""
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since:
+        return modified_at <= request.if_modified_since.timestamp()
+    return False
+
+
 @app.route("/")
 def index():
-    """Display all users"""
+    """Display all users - unchanged tables are answered with 304"""
     try:
-        users = select("users", ordered_by_pk=True)
-        return render_template("index.html", users=users)
+        etag, modified_at, modified = users_validators()
+        if is_not_modified(etag, modified_at):
+            response = make_response("", 304)
+        else:
+            # Version is read before the rows, so the page's refresh
+            # script never skips a change made while rendering
+            version = table_version("users")
+            users = select("users", ordered_by_pk=True)
+            response = make_response(render_template("index.html", users=users, version=version))
+        
+        response.set_etag(etag)
+        response.last_modified = modified
+        response.cache_control.no_cache = True
+        return response
     except Exception as e:
         return render_template("index.html", users=[], error=str(e))
 
+@app.route("/api/users/changes")
+def changes():
+    """Users changed since a table version, for incremental page refresh"""
+    since = request.args.get("since", type=int)
+    if since is None:
+        return jsonify(error="'since' must be a table version"), 400
+    
+    try:
+        return jsonify(changes_since("users", since))
+    except Exception as e:
+        return jsonify(error=str(e)), 500
+
 @app.route("/add", methods=["POST"])
 def add():
     """Add a new user"""
@@ -66,11 +133,34 @@ def delete(id):
     
     return redirect("/")
 
+@app.route("/api/users/search")
+def search():
+    """Type-ahead search on user names and emails"""
+    query = request.args.get("q", "")
+    if not query:
+        return jsonify(users=[])
+    
+    # % and _ typed by the user are matched literally
+    pattern = f"%{escape_like(query)}%"
+    
+    try:
+        found = {}
+        for column in SEARCH_COLUMNS:
+            for user in select("users", ordered_by_pk=True, limit=SEARCH_LIMIT,
+                               where=(column, "LIKE", pattern)):
+                found[user["id"]] = user
+        users = sorted(found.values(), key=lambda user: user["id"])[:SEARCH_LIMIT]
+        return jsonify(users=users)
+    except Exception as e:
+        return jsonify(users=[], error=str(e)), 500
+
 @app.route("/health")
 def health():
     """Health check endpoint"""
     return {"status": "healthy", "database": "MiniRDBMS"}
 
+ensure_search_indexes()
+
 if __name__ == "__main__":
     print("🚀 Starting MiniRDBMS Demo App")
     print("📱 Open http://localhost:5000 in your browser")